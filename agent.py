@@ -1,17 +1,26 @@
 import logging
 import re
-import yfinance as yf
+import aiofiles
+import httpx
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from typing import TypedDict, Optional, List
 from tools import get_stock_data, get_company_news, get_general_news, get_stock_highlights, get_recent_news
+from llm_cache import cache_key, get_cached_completion, set_cached_completion
 from datetime import datetime
+import hashlib
 import os
 from dotenv import load_dotenv
-import concurrent.futures
+import asyncio
 import time
 import json
+import orjson
+
+try:
+    import ahocorasick
+except ImportError:  # pure-regex fallback below
+    ahocorasick = None
 
 load_dotenv()
 DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
@@ -22,15 +31,32 @@ LM_STUDIO_MODEL = os.getenv("LM_STUDIO_MODEL", "qwen/qwen3-4b-2507") #The defaul
 logging.basicConfig(level=logging.DEBUG if DEBUG_MODE else logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared HTTP/2 connection pool for the OpenAI client - multiplexing streams
+# over pooled keep-alive connections improves TTFT under concurrent load
+_LLM_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_llm_http_client = httpx.Client(http2=True, limits=_LLM_LIMITS)
+_llm_http_async_client = httpx.AsyncClient(http2=True, limits=_LLM_LIMITS)
+
 if USE_OPENAI:
-    llm = ChatOpenAI(model="gpt-5-nano", api_key=os.getenv("OPENAI_API_KEY"))
+    llm = ChatOpenAI(
+        model="gpt-5-nano",
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=_llm_http_client,
+        http_async_client=_llm_http_async_client,
+    )
 else:
     llm = ChatOpenAI(
         model=LM_STUDIO_MODEL,
         base_url=LM_STUDIO_URL,
-        api_key="not-needed"
+        api_key="not-needed",
+        http_client=_llm_http_client,
+        http_async_client=_llm_http_async_client,
     )
 
+# JSON-mode variant for extraction calls - the model is constrained to emit
+# valid JSON, so parsing can't fail on free-form text
+json_llm = llm.bind(response_format={"type": "json_object"})
+
 class AgentState(TypedDict):
     query: str
     task_type: str
@@ -42,6 +68,7 @@ class AgentState(TypedDict):
     source: Optional[str]  # cli or other
     chat_history: Optional[List[dict]]  # List of previous queries and responses
     follow_up_topic: Optional[str]  # Topic for follow-up queries
+    background: Optional[bool]  # Internal re-invocation (cache warm), not a user-facing turn
 
 common_companies = {
     "apple": ("Apple", "AAPL"),
@@ -56,17 +83,180 @@ common_companies = {
     "jpmorgan": ("JPMorgan", "JPM"),
 }
 
+# Precompiled patterns - compiling these once at import avoids re-compiling
+# (or re-looking-up in re's internal cache) on every request
+_TASK_PREFIX_RE = re.compile(r'^(\d+):\s*(.*)')
+_TICKER_RE = re.compile(r'\b[A-Z]{2,5}\b')
+_HTML_TAG_RE = re.compile(r'<[^>]*>')  # character class instead of .*? - no backtracking
+_COMPANIES_RE = re.compile(r'\b(' + '|'.join(re.escape(k) for k in common_companies) + r')\b', re.IGNORECASE)
+_TICKER_TO_NAME = {tick: name for name, tick in common_companies.values()}
+# Fast-path router keywords - queries that clearly name a task skip the LLM
+_REPORT_RE = re.compile(r'\breport\b')
+_OVERVIEW_RE = re.compile(r'\boverview\b')
+_HIGHLIGHTS_RE = re.compile(r'\bhighlights?\b|\bupdate on\b')
+_NEWS_RE = re.compile(r'\bnews\b')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_FOLLOW_UP_RES = [re.compile(p) for p in (
+    r'^tell me more about (.+)$',
+    r'^explain (.+)$',
+    r'^details on (.+)$',
+    r'^what about (.+)$',
+    r'^more on (.+)$',
+)]
+
+# Aho-Corasick automaton over the company table: one DFA pass over the query
+# instead of a regex alternation scan, and it scales linearly as the table grows
+if ahocorasick is not None:
+    _COMPANIES_AUTOMATON = ahocorasick.Automaton()
+    for _key in common_companies:
+        _COMPANIES_AUTOMATON.add_word(_key, _key)
+    _COMPANIES_AUTOMATON.make_automaton()
+else:
+    _COMPANIES_AUTOMATON = None
+
+def _clean_news(news: List[str]) -> List[str]:
+    """Strip HTML tags from news items in one regex pass over the joined text."""
+    if not news:
+        return []
+    return _HTML_TAG_RE.sub('', "\x00".join(news)).split("\x00")
+
+def _find_companies(query_lower: str) -> List[str]:
+    """Return the common_companies keys present in the query, in match order."""
+    if _COMPANIES_AUTOMATON is not None:
+        found = []
+        last = len(query_lower) - 1
+        for end, key in _COMPANIES_AUTOMATON.iter(query_lower):
+            start = end - len(key) + 1
+            # Enforce word boundaries to match the regex behaviour
+            if (start == 0 or not query_lower[start - 1].isalnum()) and \
+               (end == last or not query_lower[end + 1].isalnum()):
+                found.append(key)
+        return found
+    return [m.group(1).lower() for m in _COMPANIES_RE.finditer(query_lower)]
+
+# Cap total outbound yfinance/news concurrency so batch requests don't
+# fan out into an unbounded thundering herd of HTTP calls
+_YF_SEM = asyncio.Semaphore(8)
+
+async def _fetch_with_sem(fn, *args):
+    async with _YF_SEM:
+        return await asyncio.to_thread(fn, *args)
+
+# Request coalescing for hot tickers: concurrent queries for the same ticker
+# await one shared in-flight fetch, and its result is reused for a short TTL
+_COALESCE_TTL_SECONDS = 30
+_inflight_fetches: dict = {}
+
+# Fire-and-forget tasks must be kept alive - the event loop only holds a weak
+# reference, so an unreferenced task can be garbage-collected mid-flight
+_background_tasks: set = set()
+
+async def _coalesced_fetch(key, fn, *args):
+    entry = _inflight_fetches.get(key)
+    if entry and entry[0] > time.time():
+        return await entry[1]
+    task = asyncio.ensure_future(_fetch_with_sem(fn, *args))
+    _inflight_fetches[key] = (time.time() + _COALESCE_TTL_SECONDS, task)
+    try:
+        return await task
+    except Exception:
+        _inflight_fetches.pop(key, None)
+        raise
+
+# Rendered-response cache for the news nodes: a repeat of the same query
+# within the TTL skips the fetch, the cleanup and the LLM summary entirely
+RESPONSE_CACHE_SECONDS = 3600
+
+def _response_cache_path(query: str, source: Optional[str]) -> str:
+    normalized = _PUNCT_RE.sub('', query.lower()).strip()
+    key = hashlib.sha256(f"{normalized}|{source}".encode()).hexdigest()
+    return f"data/resp/{key}.txt"
+
+def _get_cached_response(query: str, source: Optional[str]) -> Optional[str]:
+    file = _response_cache_path(query, source)
+    try:
+        st = os.stat(file)
+    except FileNotFoundError:
+        return None
+    if time.time() - st.st_mtime >= RESPONSE_CACHE_SECONDS:
+        return None
+    with open(file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _set_cached_response(query: str, source: Optional[str], response: str):
+    os.makedirs("data/resp", exist_ok=True)
+    with open(_response_cache_path(query, source), 'w', encoding='utf-8') as f:
+        f.write(response)
+
+def _write_if_changed(filename: str, content: str):
+    """Write atomically via temp file + rename, skipping identical content.
+
+    The rename means a crash mid-write can never leave a truncated report or
+    overview behind for a later cache read to trip on.
+    """
+    new_sha = hashlib.sha256(content.encode()).digest()
+    try:
+        with open(filename, 'rb') as f:
+            if hashlib.sha256(f.read()).digest() == new_sha:
+                return
+    except FileNotFoundError:
+        pass
+    tmp = filename + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp, filename)
+
+def cached_invoke(prompt, model=None, key_suffix: str = "") -> str:
+    """Invoke the LLM with a disk cache keyed on (model, rendered prompt).
+
+    Repeated queries (router classification, extraction, summaries) hit the
+    cache instead of paying another API round-trip.
+    """
+    key = cache_key(llm.model_name + key_suffix, prompt)
+    cached = get_cached_completion(key)
+    if cached is not None:
+        logger.debug("LLM cache hit")
+        return cached
+    content = (model or llm).invoke(prompt).content
+    set_cached_completion(key, content)
+    return content
+
+async def cached_ainvoke(prompt, internal: bool = False) -> str:
+    """Async counterpart of cached_invoke.
+
+    internal=True tags the call so run_agent_stream can tell intermediate
+    model calls apart from the ones whose output is the user-facing response.
+    """
+    key = cache_key(llm.model_name, prompt)
+    cached = get_cached_completion(key)
+    if cached is not None:
+        logger.debug("LLM cache hit")
+        return cached
+    config = {"tags": ["internal"]} if internal else None
+    content = (await llm.ainvoke(prompt, config=config)).content
+    set_cached_completion(key, content)
+    return content
+
 def time_it(func):
-    def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        logger.info(f"{func.__name__} took {time.time() - start:.2f} seconds")
-        return result
+    # perf_counter_ns avoids wall-clock jumps; %-style args defer formatting
+    # until the log record is actually emitted
+    if asyncio.iscoroutinefunction(func):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            result = await func(*args, **kwargs)
+            logger.info("%s took %.2f seconds", func.__name__, (time.perf_counter_ns() - start) / 1e9)
+            return result
+    else:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            result = func(*args, **kwargs)
+            logger.info("%s took %.2f seconds", func.__name__, (time.perf_counter_ns() - start) / 1e9)
+            return result
     return wrapper
 
 # Router: Classify query into task type
 router_prompt = PromptTemplate.from_template(
-    """Classify the query into one of: 
+    """Classify the query into one of:
     1 - Stock Report
     2 - Company Overview
     3 - Company News
@@ -77,11 +267,67 @@ router_prompt = PromptTemplate.from_template(
     Output only the number."""
 )
 
+# All prompt templates live at module scope so they are compiled once, and the
+# larger ones are split into a static system message + small dynamic user
+# message - keeping the static prefix stable lets OpenAI's server-side prompt
+# cache hit on it, which cuts input-token cost and time-to-first-token.
+extract_company_prompt = PromptTemplate.from_template(
+    "Extract company name and stock ticker from: '{query}'. "
+    "Return ONLY in this exact format: 'Company: [NAME], Ticker: [TICKER]' "
+    "If no company found, return 'None'. "
+    "Examples: "
+    "'Give me info on Apple' -> 'Company: Apple, Ticker: AAPL' "
+    "'What about TSLA?' -> 'Company: Tesla, Ticker: TSLA'"
+)
+
+extract_companies_prompt = PromptTemplate.from_template(
+    """Extract list of companies and their stock tickers from the query: {query}.
+    Output only valid JSON: {{"companies": [{{"company": "Full Name", "ticker": "SYMBOL"}}, ...]}}
+    If a term looks like a ticker (uppercase letters), use it as ticker and infer company if possible.
+    If no companies, output {{"companies": []}}
+    Examples:
+    Query: Give me update on TSLA
+    Output: {{"companies": [{{"company": "Tesla", "ticker": "TSLA"}}]}}
+    Query: update on tesla and apple
+    Output: {{"companies": [{{"company": "Tesla", "ticker": "TSLA"}}, {{"company": "Apple", "ticker": "AAPL"}}]}}
+    Query: MSFT
+    Output: {{"companies": [{{"company": "Microsoft", "ticker": "MSFT"}}]}}
+    Query: something else
+    Output: {{"companies": []}}"""
+)
+
+overview_from_report_prompt = PromptTemplate.from_template(
+    "Extract quick overview from report: {report}. Include current price, key highlights, latest news."
+)
+
+overview_prompt = PromptTemplate.from_template(
+    "Generate quick overview: Company {company}, Price: {price}, Highlights: {data}, News: {news}"
+)
+
+news_summary_system = "Summarize the following news items into key bullet points in a user-friendly way."
+
+highlights_summary_system = """Summarize the news items into exactly 5 concise bullet points,
+focusing only on news directly related to the named company.
+Merge related news points into a single bullet where appropriate to avoid redundancy.
+Output only the bullet points, with no additional comments, suggestions, or text.
+Each bullet should be clear, user-friendly, and relevant to the named company."""
+
+batch_highlights_summary_system = """For each company below, summarize its news items into exactly 5 concise bullet points,
+focusing only on news directly related to that company.
+Merge related news points into a single bullet where appropriate to avoid redundancy.
+Each bullet should be clear, user-friendly, and relevant to the company.
+Output only valid JSON mapping each company name to one string containing its bullet points:
+{"Company A": "- bullet\\n- bullet\\n...", "Company B": "..."}"""
+
+follow_up_summary_system = """Provide a detailed summary of the following information about the given topic.
+Organize into sections with headers, include key facts, context, and recent developments.
+Make it comprehensive but user-friendly."""
+
 @time_it
 def router_node(state: AgentState) -> AgentState:
     logger.info(f"Processing query: {state['query']}")
     # Check for prefix like "1: "
-    match = re.match(r'^(\d+):\s*(.*)', state["query"])
+    match = _TASK_PREFIX_RE.match(state["query"])
     if match:
         task_type = match.group(1)
         if task_type in ["1", "2", "3", "4", "5", "6"]:
@@ -95,51 +341,52 @@ def router_node(state: AgentState) -> AgentState:
 
     if not task_type:
         # Check for follow-up patterns before LLM classification
-        follow_up_patterns = [
-            r'^tell me more about (.+)$',
-            r'^explain (.+)$',
-            r'^details on (.+)$',
-            r'^what about (.+)$',
-            r'^more on (.+)$'
-        ]
-        for pattern in follow_up_patterns:
-            match = re.match(pattern, state["query"].lower())
+        for pattern in _FOLLOW_UP_RES:
+            match = pattern.match(state["query"].lower())
             if match:
                 state["task_type"] = "6"
                 state["follow_up_topic"] = match.group(1).strip()
                 logger.info(f"Detected follow-up query for topic: {state['follow_up_topic']}")
                 return state
-        
-        try:
-            task_type = llm.invoke(router_prompt.format(query=state["query"])).content.strip()
+
+        # Fast-path keyword classification - no LLM round-trip needed when the
+        # query names the task outright
+        query_lower = state["query"].lower()
+        if _REPORT_RE.search(query_lower):
+            task_type = "1"
+        elif _OVERVIEW_RE.search(query_lower):
+            task_type = "2"
+        elif _HIGHLIGHTS_RE.search(query_lower):
+            task_type = "5"
+        elif _NEWS_RE.search(query_lower):
+            task_type = "3" if _COMPANIES_RE.search(query_lower) else "4"
+
+        if task_type:
             state["task_type"] = task_type
-            logger.info(f"Classified task type: {task_type}")
-        except Exception as e:
-            logger.error(f"Error in router classification: {e}")
-            state["task_type"] = "4"  # Default to general news on error
+            logger.info(f"Fast-path classified task type: {task_type}")
+        else:
+            try:
+                task_type = cached_invoke(router_prompt.format(query=state["query"])).strip()
+                state["task_type"] = task_type
+                logger.info(f"Classified task type: {task_type}")
+            except Exception as e:
+                logger.error(f"Error in router classification: {e}")
+                state["task_type"] = "4"  # Default to general news on error
 
     # Extract company/ticker if relevant
     if state["task_type"] in ["1", "2", "3"]:
         query_lower = state["query"].lower()
         extracted = False
-        for comp in common_companies:
-            if re.search(r'\b' + re.escape(comp) + r'\b', query_lower):
-                state["company"] = common_companies[comp][0]
-                state["ticker"] = common_companies[comp][1]
-                logger.debug(f"Extracted company via regex: {state['company']}, ticker: {state['ticker']}")
-                extracted = True
-                break
+        found_companies = _find_companies(query_lower)
+        if found_companies:
+            comp = found_companies[0]
+            state["company"] = common_companies[comp][0]
+            state["ticker"] = common_companies[comp][1]
+            logger.debug(f"Extracted company via regex: {state['company']}, ticker: {state['ticker']}")
+            extracted = True
         if not extracted:
             try:
-                extract_prompt = PromptTemplate.from_template(
-                    "Extract company name and stock ticker from: '{query}'. "
-                    "Return ONLY in this exact format: 'Company: [NAME], Ticker: [TICKER]' "
-                    "If no company found, return 'None'. "
-                    "Examples: "
-                    "'Give me info on Apple' -> 'Company: Apple, Ticker: AAPL' "
-                    "'What about TSLA?' -> 'Company: Tesla, Ticker: TSLA'"
-                )
-                extract = llm.invoke(extract_prompt.format(query=state["query"])).content.strip()
+                extract = cached_invoke(extract_company_prompt.format(query=state["query"])).strip()
                 logger.debug(f"LLM extraction result: {extract}")
                 
                 if "None" not in extract and "Company:" in extract and "Ticker:" in extract:
@@ -162,27 +409,19 @@ def router_node(state: AgentState) -> AgentState:
         query_lower = state["query"].lower()
         seen_tickers = set()
         companies_list = []
-        # Regex extraction for common companies (case-insensitive)
-        for comp in common_companies:
-            if re.search(r'\b' + re.escape(comp) + r'\b', query_lower):
-                ticker = common_companies[comp][1]
-                if ticker not in seen_tickers:
-                    companies_list.append({"company": common_companies[comp][0], "ticker": ticker})
-                    seen_tickers.add(ticker)
+        # Extract common companies in one pass over the query (case-insensitive)
+        for comp in _find_companies(query_lower):
+            ticker = common_companies[comp][1]
+            if ticker not in seen_tickers:
+                companies_list.append({"company": common_companies[comp][0], "ticker": ticker})
+                seen_tickers.add(ticker)
         # Find potential tickers (uppercase 2-5 letters)
-        potential_tickers = re.findall(r'\b[A-Z]{2,5}\b', state["query"])
+        potential_tickers = _TICKER_RE.findall(state["query"])
         for pt in potential_tickers:
             if pt not in seen_tickers:
-                found = False
-                for comp, (name, tick) in common_companies.items():
-                    if tick == pt:
-                        companies_list.append({"company": name, "ticker": pt})
-                        seen_tickers.add(pt)
-                        found = True
-                        break
-                if not found:
-                    companies_list.append({"company": pt, "ticker": pt})
-                    seen_tickers.add(pt)
+                name = _TICKER_TO_NAME.get(pt)
+                companies_list.append({"company": name or pt, "ticker": pt})
+                seen_tickers.add(pt)
         if companies_list:
             # Validate each entry
             valid_companies = []
@@ -198,24 +437,9 @@ def router_node(state: AgentState) -> AgentState:
         else:
             # Fallback to LLM if regex finds nothing
             try:
-                extract_prompt = PromptTemplate.from_template(
-                    """Extract list of companies and their stock tickers from the query: {query}.
-                    Output only valid JSON: [{"company": "Full Name", "ticker": "SYMBOL"}, ...]
-                    If a term looks like a ticker (uppercase letters), use it as ticker and infer company if possible.
-                    If no companies, output []
-                    Examples:
-                    Query: Give me update on TSLA
-                    Output: [{"company": "Tesla", "ticker": "TSLA"}]
-                    Query: update on tesla and apple
-                    Output: [{"company": "Tesla", "ticker": "TSLA"}, {"company": "Apple", "ticker": "AAPL"}]
-                    Query: MSFT
-                    Output: [{"company": "Microsoft", "ticker": "MSFT"}]
-                    Query: something else
-                    Output: []"""
-                )
-                extract = llm.invoke(extract_prompt.format(query=state["query"])).content.strip()
+                extract = cached_invoke(extract_companies_prompt.format(query=state["query"]), model=json_llm, key_suffix=":json").strip()
                 logger.debug(f"Raw LLM extract output: {extract}")
-                companies_list = json.loads(extract)
+                companies_list = orjson.loads(extract).get("companies", [])
                 # Validate LLM output
                 valid_companies = []
                 for cd in companies_list:
@@ -232,7 +456,7 @@ def router_node(state: AgentState) -> AgentState:
                 else:
                     state["response"] = "No companies found in the query."
                     logger.info("No companies extracted for highlights")
-            except json.JSONDecodeError as je:
+            except orjson.JSONDecodeError as je:
                 logger.error(f"JSON decode error in LLM extract: {je} - Raw output: {extract}")
                 state["companies"] = []
                 state["response"] = "No companies found in the query."
@@ -242,41 +466,40 @@ def router_node(state: AgentState) -> AgentState:
     return state
 
 # Task 1: Generate Full Report
-report_prompt = PromptTemplate.from_template(
-    """Generate a detailed stock report in Markdown using this data: {data}
+report_system = """Generate a detailed stock report in Markdown using the provided data and news.
     Structure:
     - Company Name, Ticker, Date, Current Price, Price Target
     - Business Description: ...
     - Market Profile (Table): ...
     - Industry Overview and Competitive Positioning: ...
-    - Recent News: {news}
+    - Recent News: ...
     - Volatility and Risk Metrics: ...
     Infer missing parts like industry overview, etc.
     """
-)
 
 @time_it
-def generate_report_node(state: AgentState) -> AgentState:
+async def generate_report_node(state: AgentState) -> AgentState:
     if state.get("ticker"):
         logger.debug(f"Generating report for ticker: {state['ticker']}")
         try:
             date = datetime.now().strftime("%Y-%m-%d")
             filename = f"reports/{state['ticker']}_{date}.md"
             if os.path.exists(filename):
-                with open(filename, "r", encoding="utf-8") as f:
-                    state["response"] = f.read()
+                async with aiofiles.open(filename, "r", encoding="utf-8") as f:
+                    state["response"] = await f.read()
                 logger.info(f"Loaded pre-generated report for {state['ticker']}")
             else:
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future_data = executor.submit(get_stock_data, state["ticker"])
-                    future_news = executor.submit(get_company_news, state["company"])
-                    state["data"] = future_data.result()
-                    state["news"] = future_news.result()
-                clean_news = [re.sub(r'<.*?>', '', item) for item in state["news"]]
-                response = llm.invoke(report_prompt.format(data=state["data"], news="\n".join(clean_news))).content
+                state["data"], state["news"] = await asyncio.gather(
+                    _fetch_with_sem(get_stock_data, state["ticker"]),
+                    _fetch_with_sem(get_company_news, state["company"]),
+                )
+                clean_news = _clean_news(state["news"])
+                response = await cached_ainvoke([
+                    {"role": "system", "content": report_system},
+                    {"role": "user", "content": f"Data: {state['data']}\n\nNews:\n" + "\n".join(clean_news)},
+                ], internal=bool(state.get("background")))
                 os.makedirs("reports", exist_ok=True)
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(response)
+                await asyncio.to_thread(_write_if_changed, filename, response)
                 state["response"] = response
                 logger.info(f"Report generated and saved for {state['ticker']}")
         except Exception as e:
@@ -288,18 +511,19 @@ def generate_report_node(state: AgentState) -> AgentState:
 
 # Task 2: Generate Overview (use cached report if recent, else generate simple)
 @time_it
-def generate_overview_node(state: AgentState) -> AgentState:
+async def generate_overview_node(state: AgentState) -> AgentState:
     if state.get("ticker"):
         logger.debug(f"Generating overview for ticker: {state['ticker']}")
         try:
             date = datetime.now().strftime("%Y-%m-%d")
             overview_file = f"overviews/{state['ticker']}_{date}.md"
             if os.path.exists(overview_file):
-                with open(overview_file, "r", encoding="utf-8") as f:
-                    response = f.read()
+                async with aiofiles.open(overview_file, "r", encoding="utf-8") as f:
+                    response = await f.read()
                 # Append live current price
                 try:
-                    live_price = yf.Ticker(state['ticker']).info.get('currentPrice')
+                    import yfinance as yf  # deferred - heavy import, only needed here
+                    live_price = (await _fetch_with_sem(lambda: yf.Ticker(state['ticker']).info)).get('currentPrice')
                     if live_price:
                         response += f"\n\n**Live Current Price:** {live_price}"
                 except Exception as e:
@@ -307,30 +531,30 @@ def generate_overview_node(state: AgentState) -> AgentState:
                 state["response"] = response
                 logger.info(f"Loaded pre-generated overview for {state['ticker']}")
             else:
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future_data = executor.submit(get_stock_data, state["ticker"])
-                    future_news = executor.submit(get_company_news, state["company"])
-                    state["data"] = future_data.result()
-                    state["news"] = future_news.result()
-                clean_news = [re.sub(r'<.*?>', '', item) for item in state["news"]]
+                state["data"], state["news"] = await asyncio.gather(
+                    _fetch_with_sem(get_stock_data, state["ticker"]),
+                    _fetch_with_sem(get_company_news, state["company"]),
+                )
+                clean_news = _clean_news(state["news"])
                 # Check for recent report as fallback
                 report_file = f"reports/{state['ticker']}_{date}.md"
                 if os.path.exists(report_file):
-                    with open(report_file, "r", encoding="utf-8") as f:
-                        report = f.read()
-                    overview_prompt = PromptTemplate.from_template("Extract quick overview from report: {report}. Include current price, key highlights, latest news.")
-                    state["response"] = llm.invoke(overview_prompt.format(report=report)).content
+                    async with aiofiles.open(report_file, "r", encoding="utf-8") as f:
+                        report = await f.read()
+                    state["response"] = await cached_ainvoke(overview_from_report_prompt.format(report=report))
                     logger.debug("Used existing report for overview")
                 else:
-                    overview_prompt = PromptTemplate.from_template("Generate quick overview: Company {company}, Price: {price}, Highlights: {data}, News: {news}")
-                    state["response"] = llm.invoke(overview_prompt.format(company=state["company"], price=state["data"].get("current_price"), data=state["data"], news="\n".join(clean_news))).content
+                    state["response"] = await cached_ainvoke(overview_prompt.format(company=state["company"], price=state["data"].get("current_price"), data=state["data"], news="\n".join(clean_news)))
                     logger.debug("Generated new overview")
                 # Save overview for future
                 os.makedirs("overviews", exist_ok=True)
-                with open(overview_file, "w", encoding="utf-8") as f:
-                    f.write(state["response"])
-                # Save full report after
-                generate_report_node(state)
+                await asyncio.to_thread(_write_if_changed, overview_file, state["response"])
+                # Warm the report cache in the background - the report is not
+                # part of this response, so don't serialize a second full LLM
+                # generation into the user's latency budget
+                task = asyncio.create_task(generate_report_node({**state, "background": True}))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
         except Exception as e:
             logger.error(f"Error generating overview: {e}")
             state["response"] = "Error generating overview."
@@ -341,19 +565,24 @@ def generate_overview_node(state: AgentState) -> AgentState:
 # Task 3: Company News
 @time_it
 def get_company_news_node(state: AgentState) -> AgentState:
+    cached = _get_cached_response(state["query"], state.get("source"))
+    if cached is not None:
+        state["response"] = cached
+        logger.info(f"Served company news from response cache for {state.get('company')}")
+        return state
     try:
         state["news"] = get_company_news(state["company"])
-        clean_news = [re.sub(r'<.*?>', '', item) for item in state["news"]]
+        clean_news = _clean_news(state["news"])
         if state.get("source") == "cli":
-            summary_prompt = PromptTemplate.from_template(
-                """Summarize the following news items into key bullet points in a user-friendly way:
-{news}"""
-            )
-            state["response"] = llm.invoke(summary_prompt.format(news="\n\n".join(clean_news))).content
+            state["response"] = cached_invoke([
+                {"role": "system", "content": news_summary_system},
+                {"role": "user", "content": "\n\n".join(clean_news)},
+            ])
             logger.info(f"Fetched and summarized company news for {state['company']}")
         else:
             state["response"] = "\n\n".join(clean_news)
             logger.info(f"Fetched raw company news for {state['company']}")
+        _set_cached_response(state["query"], state.get("source"), state["response"])
     except Exception as e:
         logger.error(f"Error fetching company news: {e}")
         state["response"] = "Error fetching news."
@@ -362,20 +591,25 @@ def get_company_news_node(state: AgentState) -> AgentState:
 # Task 4: General News
 @time_it
 def get_general_news_node(state: AgentState) -> AgentState:
+    cached = _get_cached_response(state["query"], state.get("source"))
+    if cached is not None:
+        state["response"] = cached
+        logger.info("Served general news from response cache")
+        return state
     topic = state["query"].replace("What is the latest news on", "").strip()  # Simple extraction
     try:
         state["news"] = get_general_news(topic)
-        clean_news = [re.sub(r'<.*?>', '', item) for item in state["news"]]
+        clean_news = _clean_news(state["news"])
         if state.get("source") == "cli":
-            summary_prompt = PromptTemplate.from_template(
-                """Summarize the following news items into key bullet points in a user-friendly way:
-{news}"""
-            )
-            state["response"] = llm.invoke(summary_prompt.format(news="\n\n".join(clean_news))).content
+            state["response"] = cached_invoke([
+                {"role": "system", "content": news_summary_system},
+                {"role": "user", "content": "\n\n".join(clean_news)},
+            ])
             logger.info(f"Fetched and summarized general news for topic: {topic}")
         else:
             state["response"] = "\n\n".join(clean_news)
             logger.info(f"Fetched raw general news for topic: {topic}")
+        _set_cached_response(state["query"], state.get("source"), state["response"])
     except Exception as e:
         logger.error(f"Error fetching general news: {e}")
         state["response"] = "Error fetching news."
@@ -383,38 +617,61 @@ def get_general_news_node(state: AgentState) -> AgentState:
 
 # Task 5: Highlights
 @time_it
-def generate_highlights_node(state: AgentState) -> AgentState:
+async def generate_highlights_node(state: AgentState) -> AgentState:
     if not state.get("companies"):
         state["response"] = "No companies to generate highlights for."
         return state
 
     try:
-        def fetch_highlights(cd):
+        async def fetch_highlights(cd):
             company = cd['company']
             ticker = cd['ticker']
             # Infer company name if it's just the ticker
             if company == ticker:
                 try:
-                    company = yf.Ticker(ticker).info.get('shortName', company)
+                    import yfinance as yf  # deferred - heavy import, only needed here
+                    info = await _fetch_with_sem(lambda: yf.Ticker(ticker).info)
+                    company = info.get('shortName', company)
                 except Exception as e:
                     logger.debug(f"Failed to infer company for {ticker}: {e}")
+            stock, news = await asyncio.gather(
+                _coalesced_fetch(("highlights", ticker), get_stock_highlights, ticker),
+                _coalesced_fetch(("news", ticker), get_recent_news, ticker, company),
+            )
             return {
                 'company': company,
                 'ticker': ticker,
-                'stock': get_stock_highlights(ticker),
-                'news': get_recent_news(ticker, company)
+                'stock': stock,
+                'news': news
             }
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = [executor.submit(fetch_highlights, cd) for cd in state["companies"]]
-            highlights = []
-            for f in concurrent.futures.as_completed(futures):
-                try:
-                    highlights.append(f.result())
-                except Exception as exc:
-                    logger.error(f"Future raised exception: {exc}")
+        results = await asyncio.gather(*(fetch_highlights(cd) for cd in state["companies"]), return_exceptions=True)
+        highlights = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Highlights fetch raised exception: {result}")
+            else:
+                highlights.append(result)
 
         if state.get("source") == "cli":
+            # Summarize all companies in one batched LLM call instead of one
+            # serialized round-trip per company
+            summaries = {}
+            to_summarize = [h for h in highlights if h['news']]
+            if to_summarize:
+                news_blocks = "\n\n".join(
+                    f"Company: {h['company']}\n" + "\n\n".join(h['news']) for h in to_summarize
+                )
+                try:
+                    raw = await cached_ainvoke([
+                        {"role": "system", "content": batch_highlights_summary_system},
+                        {"role": "user", "content": news_blocks},
+                    ], internal=True)
+                    summaries = json.loads(raw)
+                except json.JSONDecodeError as je:
+                    logger.error(f"JSON decode error in batched news summary: {je}")
+                except Exception as e:
+                    logger.error(f"Error in batched news summary: {e}")
             response_parts = []
             for h in highlights:
                 logger.debug(f"Processing highlights for {h.get('company', 'Unknown')} ({h.get('ticker', 'Unknown')})")
@@ -423,16 +680,14 @@ def generate_highlights_node(state: AgentState) -> AgentState:
                 if not news:
                     news_summary = "No recent news available."
                 else:
-                    clean_news = "\n\n".join(news)
-                    summary_prompt = PromptTemplate.from_template(
-                        """Summarize the following news items into exactly 5 concise bullet points, 
-                        focusing only on news directly related to {company}. 
-                        Merge related news points into a single bullet where appropriate to avoid redundancy. 
-                        Output only the bullet points, with no additional comments, suggestions, or text. 
-                        Each bullet should be clear, user-friendly, and relevant to {company}.
-                        {news}"""
-                    )
-                    news_summary = llm.invoke(summary_prompt.format(company=h['company'], news=clean_news)).content
+                    news_summary = summaries.get(h['company'])
+                    if not news_summary:
+                        # Per-company fallback if the batched call missed this one
+                        clean_news = "\n\n".join(news)
+                        news_summary = await cached_ainvoke([
+                            {"role": "system", "content": highlights_summary_system},
+                            {"role": "user", "content": f"Company: {h['company']}\n\n{clean_news}"},
+                        ], internal=True)
                 part = f"**{h['company']} ({h['ticker']})**\n"
                 part += f"Current Price: {stock.get('current_price', 'N/A')}\n"
                 daily_change = stock.get('daily_change')
@@ -469,16 +724,13 @@ def follow_up_node(state: AgentState) -> AgentState:
         # Use Brave Search for deeper, more detailed results
         from tools import get_news
         detailed_news = get_news(f"detailed information about {topic}", num_results=10)
-        clean_news = [re.sub(r'<.*?>', '', item) for item in detailed_news]
+        clean_news = _clean_news(detailed_news)
         
         if state.get("source") == "cli":
-            summary_prompt = PromptTemplate.from_template(
-                """Provide a detailed summary of the following information about {topic}.
-                Organize into sections with headers, include key facts, context, and recent developments.
-                Make it comprehensive but user-friendly:
-{news}"""
-            )
-            state["response"] = llm.invoke(summary_prompt.format(topic=topic, news="\n\n".join(clean_news))).content
+            state["response"] = cached_invoke([
+                {"role": "system", "content": follow_up_summary_system},
+                {"role": "user", "content": f"Topic: {topic}\n\n" + "\n\n".join(clean_news)},
+            ])
             logger.info(f"Generated detailed follow-up summary for {topic}")
         else:
             state["response"] = "\n\n".join(clean_news)
@@ -522,16 +774,16 @@ graph.add_edge("follow_up", END)
 agent = graph.compile()
 
 @time_it
-def run_agent(query: str, source: Optional[str] = None, chat_history: Optional[List[dict]] = None) -> tuple[str, List[dict]]:
+async def run_agent(query: str, source: Optional[str] = None, chat_history: Optional[List[dict]] = None) -> tuple[str, List[dict]]:
     if chat_history is None:
         chat_history = []
-    
+
     state = {
-        "query": query, 
+        "query": query,
         "source": source,
         "chat_history": chat_history.copy()  # Pass copy to avoid mutation
     }
-    result = agent.invoke(state)
+    result = await agent.ainvoke(state)
     
     # Add current interaction to history
     chat_history.append({
@@ -543,5 +795,47 @@ def run_agent(query: str, source: Optional[str] = None, chat_history: Optional[L
     # Keep only last 10 interactions to prevent memory issues
     if len(chat_history) > 10:
         chat_history = chat_history[-10:]
-    
-    return result["response"], chat_history
\ No newline at end of file
+
+    return result["response"], chat_history
+
+# Nodes whose LLM output is returned to the user verbatim and is therefore
+# safe to stream token-by-token
+_STREAMING_NODES = {"report", "overview", "company_news", "general_news", "follow_up"}
+
+async def run_agent_stream(query: str, source: Optional[str] = None, chat_history: Optional[List[dict]] = None):
+    """Stream the agent's response chunk-by-chunk for lower perceived latency.
+
+    LLM tokens from the user-facing nodes are forwarded as they arrive; when
+    the response came from a file or completion cache (so nothing streamed),
+    the full text is yielded once at the end.
+    """
+    if chat_history is None:
+        chat_history = []
+
+    state = {
+        "query": query,
+        "source": source,
+        "chat_history": chat_history.copy()
+    }
+    streamed = False
+    final = None
+    async for event in agent.astream_events(state, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            # Only forward tokens from nodes whose model output IS the
+            # response. Everything else - router/extraction calls, the
+            # highlights summarizers (their JSON gets composed into the
+            # response, not returned verbatim) and the background report
+            # warm spawned by the overview node - is internal
+            if event.get("metadata", {}).get("langgraph_node") not in _STREAMING_NODES:
+                continue
+            if "internal" in (event.get("tags") or []):
+                continue
+            content = event["data"]["chunk"].content
+            if content:
+                streamed = True
+                yield content
+        elif kind == "on_chain_end" and event.get("name") == "LangGraph":
+            final = event["data"]["output"]
+    if not streamed and final:
+        yield final.get("response", "")
\ No newline at end of file
@@ -1,12 +1,13 @@
 import logging
 import time
 from fastapi import FastAPI, Body
+from fastapi.responses import StreamingResponse
 from models import QueryRequest, AnalysisResponse
-from agent import run_agent
+from agent import run_agent, run_agent_stream
 from dotenv import load_dotenv
 import os
 from typing import List
-import concurrent.futures
+import asyncio
 
 load_dotenv()
 DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
@@ -17,11 +18,11 @@ logger = logging.getLogger(__name__)
 app = FastAPI()
 
 @app.post("/analyze", response_model=AnalysisResponse)
-def analyze(query: QueryRequest):
+async def analyze(query: QueryRequest):
     logger.info(f"Incoming query: {query.query}")
     start_time = time.time()
     try:
-        result, updated_history = run_agent(query.query, source=query.source, chat_history=query.chat_history)
+        result, updated_history = await run_agent(query.query, source=query.source, chat_history=query.chat_history)
         end_time = time.time()
         logger.info(f"Time taken to process query: {end_time - start_time:.2f}s")
         logger.info(f"Response sent (length: {len(result)} characters)")
@@ -34,16 +35,27 @@ def analyze(query: QueryRequest):
         logger.info(f"Time taken (error): {end_time - start_time:.2f}s")
         return AnalysisResponse(result="An error occurred during processing.")
 
+@app.post("/analyze/stream")
+async def analyze_stream(query: QueryRequest):
+    logger.info(f"Incoming streaming query: {query.query}")
+    return StreamingResponse(
+        run_agent_stream(query.query, source=query.source, chat_history=query.chat_history),
+        media_type="text/plain",
+    )
+
 @app.post("/batch_analyze", response_model=List[AnalysisResponse])
-def batch_analyze(queries: List[QueryRequest] = Body(...)):
+async def batch_analyze(queries: List[QueryRequest] = Body(...)):
     logger.info(f"Incoming batch queries: {len(queries)}")
     start_time = time.time()
     try:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = [executor.submit(run_agent, q.query, source=q.source) for q in queries]
-            results = []
-            for future in concurrent.futures.as_completed(futures):
-                results.append(AnalysisResponse(result=future.result()))
+        outcomes = await asyncio.gather(*(run_agent(q.query, source=q.source) for q in queries), return_exceptions=True)
+        results = []
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                logger.error(f"Batch query failed: {outcome}")
+                results.append(AnalysisResponse(result="An error occurred during processing."))
+            else:
+                results.append(AnalysisResponse(result=outcome[0]))
         end_time = time.time()
         logger.info(f"Time taken to process batch: {end_time - start_time:.2f}s")
         return results
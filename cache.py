@@ -1,49 +1,94 @@
 import time
 import os
-import json
+import orjson
 from typing import Dict, Any, Optional, List
 
 CACHE_EXPIRATION_SECONDS = 86400  # 24 hours for general data and news
 CACHE_HIGHLIGHTS_SECONDS = 300  # 5 minutes for highlights (live prices)
 
+# Grace windows for stale-while-revalidate: entries past their TTL but within
+# TTL + grace are still served while the caller refreshes in the background
+CACHE_HIGHLIGHTS_GRACE_SECONDS = 300
+CACHE_NEWS_GRACE_SECONDS = 3600
+
+CACHE_DESCRIPTION_SECONDS = 7 * 86400  # business descriptions churn slowly
+
+# In-process cache of parsed payloads keyed by file path, invalidated when the
+# file's mtime changes - repeated hits on a hot ticker skip the read + parse
+_MEM_CACHE: Dict[str, tuple] = {}
+
+def _read_cached_file(file: str, ttl: int) -> Optional[Any]:
+    try:
+        st = os.stat(file)
+    except FileNotFoundError:
+        _MEM_CACHE.pop(file, None)
+        return None
+    if time.time() - st.st_mtime >= ttl:
+        return None
+    cached = _MEM_CACHE.get(file)
+    if cached and cached[0] == st.st_mtime:
+        return cached[1]
+    with open(file, 'rb') as f:
+        payload = orjson.loads(f.read())
+    _MEM_CACHE[file] = (st.st_mtime, payload)
+    return payload
+
+def _read_cached_file_stale(file: str, ttl: int, grace: int) -> tuple:
+    """Like _read_cached_file, but reports freshness instead of dropping stale
+    entries: returns (payload, fresh). Entries older than ttl + grace return
+    (None, False)."""
+    try:
+        st = os.stat(file)
+    except FileNotFoundError:
+        _MEM_CACHE.pop(file, None)
+        return None, False
+    age = time.time() - st.st_mtime
+    if age >= ttl + grace:
+        return None, False
+    cached = _MEM_CACHE.get(file)
+    if cached and cached[0] == st.st_mtime:
+        return cached[1], age < ttl
+    with open(file, 'rb') as f:
+        payload = orjson.loads(f.read())
+    _MEM_CACHE[file] = (st.st_mtime, payload)
+    return payload, age < ttl
+
 def get_cached_data(ticker: str) -> Optional[Dict[str, Any]]:
-    file = f"data/{ticker}_metrics.json"
-    if os.path.exists(file):
-        mtime = os.path.getmtime(file)
-        if time.time() - mtime < CACHE_EXPIRATION_SECONDS:
-            with open(file, 'r') as f:
-                return json.load(f)
-    return None
+    return _read_cached_file(f"data/{ticker}_metrics.json", CACHE_EXPIRATION_SECONDS)
 
 def set_cached_data(ticker: str, data: Dict[str, Any]):
     os.makedirs("data", exist_ok=True)
-    with open(f"data/{ticker}_metrics.json", 'w') as f:
-        json.dump(data, f, indent=4)
+    with open(f"data/{ticker}_metrics.json", 'wb') as f:
+        # OPT_SERIALIZE_NUMPY: the metrics carry numpy scalars straight from
+        # the return calculations, which orjson rejects by default
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
 def get_cached_news(ticker: str) -> Optional[List[str]]:
-    file = f"data/{ticker}_news.json"
-    if os.path.exists(file):
-        mtime = os.path.getmtime(file)
-        if time.time() - mtime < CACHE_EXPIRATION_SECONDS:
-            with open(file, 'r') as f:
-                return json.load(f)
-    return None
+    return _read_cached_file(f"data/{ticker}_news.json", CACHE_EXPIRATION_SECONDS)
+
+def get_cached_news_stale(ticker: str) -> tuple:
+    return _read_cached_file_stale(f"data/{ticker}_news.json", CACHE_EXPIRATION_SECONDS, CACHE_NEWS_GRACE_SECONDS)
 
 def set_cached_news(ticker: str, news: List[str]):
     os.makedirs("data", exist_ok=True)
-    with open(f"data/{ticker}_news.json", 'w') as f:
-        json.dump(news, f)
+    with open(f"data/{ticker}_news.json", 'wb') as f:
+        f.write(orjson.dumps(news, option=orjson.OPT_SERIALIZE_NUMPY))
+
+def get_cached_description(ticker: str) -> Optional[str]:
+    return _read_cached_file(f"data/{ticker}_description.json", CACHE_DESCRIPTION_SECONDS)
+
+def set_cached_description(ticker: str, text: str):
+    os.makedirs("data", exist_ok=True)
+    with open(f"data/{ticker}_description.json", 'wb') as f:
+        f.write(orjson.dumps(text, option=orjson.OPT_SERIALIZE_NUMPY))
 
 def get_cached_highlights(ticker: str) -> Optional[Dict[str, Any]]:
-    file = f"data/{ticker}_highlights.json"
-    if os.path.exists(file):
-        mtime = os.path.getmtime(file)
-        if time.time() - mtime < CACHE_HIGHLIGHTS_SECONDS:
-            with open(file, 'r') as f:
-                return json.load(f)
-    return None
+    return _read_cached_file(f"data/{ticker}_highlights.json", CACHE_HIGHLIGHTS_SECONDS)
+
+def get_cached_highlights_stale(ticker: str) -> tuple:
+    return _read_cached_file_stale(f"data/{ticker}_highlights.json", CACHE_HIGHLIGHTS_SECONDS, CACHE_HIGHLIGHTS_GRACE_SECONDS)
 
 def set_cached_highlights(ticker: str, data: Dict[str, Any]):
     os.makedirs("data", exist_ok=True)
-    with open(f"data/{ticker}_highlights.json", 'w') as f:
-        json.dump(data, f)
\ No newline at end of file
+    with open(f"data/{ticker}_highlights.json", 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY))
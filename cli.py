@@ -1,30 +1,41 @@
-import requests
+import httpx
 import sys
 
 chat_history = []
 
+# One client for the whole CLI session - keep-alive means each turn reuses the
+# TCP connection instead of paying handshake setup per query
+_CLIENT = httpx.Client(base_url="http://localhost:8001", timeout=60)
+
 def query_stella(query: str):
-    """Send a query to the Stella API and print the response."""
+    """Send a query to the Stella API and print the response as it streams."""
     global chat_history
     try:
-        response = requests.post("http://localhost:8001/analyze", json={"query": query, "source": "cli", "chat_history": chat_history})
-        if response.status_code == 200:
-            result = response.json()["result"]
-            print("\n" + result + "\n")
-            # Update chat history (this would be better if the API returned the updated history)
-            # For now, we'll maintain it locally
-            from datetime import datetime
-            chat_history.append({
-                "query": query,
-                "response": result,
-                "timestamp": datetime.now().isoformat()
-            })
-            # Keep only last 10 interactions
-            if len(chat_history) > 10:
-                chat_history = chat_history[-10:]
-        else:
-            print(f"\nError: {response.text}\n")
-    except requests.exceptions.RequestException as e:
+        result_parts = []
+        with _CLIENT.stream("POST", "/analyze/stream", json={"query": query, "source": "cli", "chat_history": chat_history}) as response:
+            if response.status_code == 200:
+                print()
+                # Print tokens as they arrive instead of waiting for the full response
+                for chunk in response.iter_text():
+                    print(chunk, end="", flush=True)
+                    result_parts.append(chunk)
+                print("\n")
+            else:
+                print(f"\nError: {response.read().decode()}\n")
+                return
+        result = "".join(result_parts)
+        # Update chat history (this would be better if the API returned the updated history)
+        # For now, we'll maintain it locally
+        from datetime import datetime
+        chat_history.append({
+            "query": query,
+            "response": result,
+            "timestamp": datetime.now().isoformat()
+        })
+        # Keep only last 10 interactions
+        if len(chat_history) > 10:
+            chat_history = chat_history[-10:]
+    except httpx.HTTPError as e:
         print(f"\nError: Failed to connect to the server - {e}\n")
 
 def print_welcome_message():
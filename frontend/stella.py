@@ -1,7 +1,13 @@
 import streamlit as st
 import requests
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 import time
-from typing import List, Dict, Optional
+import hashlib
+import sqlite3
+from collections import deque
+from typing import Final, List, Dict, Optional
 import os
 from dotenv import load_dotenv
 
@@ -12,24 +18,113 @@ load_dotenv()
 API_URL = "http://127.0.0.1:8001/analyze"
 API_TIMEOUT = 60
 
+# One pooled session for every API call - persistent keep-alive connections
+# mean each turn skips the TCP handshake to the backend
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.headers.update({"Connection": "keep-alive"})
+
+# Persistent client for the analyze path - the pool outlives a single chat
+# turn, so repeated queries reuse the same backend connection. HTTP/2 is left
+# off because uvicorn serves HTTP/1.1 only
+CLIENT = httpx.Client(timeout=API_TIMEOUT, limits=httpx.Limits(max_connections=4, max_keepalive_connections=4))
+
+# Bounds the multi-query fan-out so a long ticker list can't flood the API
+_CALL_POOL = ThreadPoolExecutor(max_workers=4)
+
 # LLM Configuration for Streamlit
 USE_OPENAI = os.getenv("USE_OPENAI", "true").lower() == "true"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 LM_STUDIO_URL = os.getenv("LM_STUDIO_URL", "http://127.0.0.1:1234/v1")
 LM_STUDIO_MODEL = os.getenv("LM_STUDIO_MODEL", "qwen/qwen3-4b-2507")
 
-if USE_OPENAI and OPENAI_API_KEY:
-    from langchain_openai import ChatOpenAI
-    frontend_llm = ChatOpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY)
-elif not USE_OPENAI:
-    from langchain_openai import ChatOpenAI
-    frontend_llm = ChatOpenAI(
-        model=LM_STUDIO_MODEL,
-        base_url=LM_STUDIO_URL,
-        api_key="not-needed"
-    )
-else:
-    frontend_llm = None
+@st.cache_resource
+def get_frontend_llm():
+    """Build the polish LLM once per server process.
+
+    st.cache_resource keeps the client (and its connection pool) alive across
+    reruns instead of re-importing langchain_openai and re-constructing it on
+    every script execution.
+    """
+    if USE_OPENAI and OPENAI_API_KEY:
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY, streaming=True)
+    if not USE_OPENAI:
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=LM_STUDIO_MODEL,
+            base_url=LM_STUDIO_URL,
+            api_key="not-needed",
+            streaming=True
+        )
+    return None
+
+# Semantic-cache tuning: raw responses whose embeddings are at least this
+# similar reuse a prior polish without another LLM call
+SEMANTIC_SIMILARITY_THRESHOLD = 0.93
+
+class LLMCache:
+    """On-disk cache for polished responses with exact and semantic tiers.
+
+    Exact tier keys on sha256(query + raw response). Semantic tier embeds the
+    raw response and compares cosine similarity against prior entries, so a
+    near-duplicate Stella response skips the reformatting call entirely.
+    """
+
+    def __init__(self, path: str = "data/llm_cache.sqlite"):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT, embedding BLOB)"
+        )
+        self._conn.commit()
+        self._embedder = None
+
+    @staticmethod
+    def make_key(user_query: str, raw_response: str) -> str:
+        return hashlib.sha256(f"{user_query}\n{raw_response}".encode()).hexdigest()
+
+    def _embed(self, text: str):
+        import numpy as np
+        if self._embedder is None:
+            from langchain_openai import OpenAIEmbeddings
+            self._embedder = OpenAIEmbeddings(model="text-embedding-3-small")
+        return np.asarray(self._embedder.embed_query(text), dtype=np.float32)
+
+    def get(self, key: str, raw_response: Optional[str] = None) -> Optional[str]:
+        row = self._conn.execute("SELECT response FROM cache WHERE key = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+        if raw_response and USE_OPENAI and OPENAI_API_KEY:
+            try:
+                import numpy as np
+                rows = self._conn.execute(
+                    "SELECT response, embedding FROM cache WHERE embedding IS NOT NULL"
+                ).fetchall()
+                if rows:
+                    new = self._embed(raw_response)
+                    embeddings = np.vstack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+                    sims = embeddings @ new / (np.linalg.norm(embeddings, axis=1) * np.linalg.norm(new))
+                    best = int(sims.argmax())
+                    if sims[best] >= SEMANTIC_SIMILARITY_THRESHOLD:
+                        return rows[best][0]
+            except Exception:
+                pass  # semantic tier is best-effort; fall through to a miss
+        return None
+
+    def set(self, key: str, raw_response: str, processed: str):
+        embedding = None
+        if USE_OPENAI and OPENAI_API_KEY:
+            try:
+                embedding = self._embed(raw_response).tobytes()
+            except Exception:
+                pass
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (key, processed, embedding)
+        )
+        self._conn.commit()
+
+_llm_cache = LLMCache()
 
 # Page configuration
 st.set_page_config(
@@ -39,7 +134,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
+# Static page chrome, built once at import instead of on every rerun. The
+# st.markdown injections themselves still run per rerun (Streamlit redraws the
+# page each time) but only reuse these strings.
+_CSS: Final[str] = """
 <style>
     /* Global Typography & Spacing Fixes */
     .stApp {
@@ -145,51 +243,102 @@ st.markdown("""
     /* Reduce Streamlit defaults */
     .css-1d391kg, .css-10trblm { background-color: transparent !important; }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+_EXAMPLES_HTML: Final[str] = """
+        <div class="task-examples">
+        <strong>Stock Analysis:</strong><br>
+        • "Generate a stock report for Tesla"<br>
+        • "Overview of Microsoft"<br>
+        • "Latest news on Apple"<br>
+        • "Today's update on Tesla, Apple"<br><br>
+        <strong>News & Follow-ups:</strong><br>
+        • "Latest AI news"<br>
+        • "More on Nvidia's AI chips"<br>
+        • "Explain Tesla's new model"
+        </div>
+        """
+
+st.markdown(_CSS, unsafe_allow_html=True)
 
 def initialize_session_state():
     """Initialize session state variables"""
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        # maxlen enforces the 10-interaction window; appends drop the oldest
+        # entry automatically instead of reslicing the list each turn
+        st.session_state.chat_history = deque(maxlen=10)
     if "use_llm_processing" not in st.session_state:
         st.session_state.use_llm_processing = True
+    if "cache_hits" not in st.session_state:
+        st.session_state.cache_hits = 0
+    if "cache_misses" not in st.session_state:
+        st.session_state.cache_misses = 0
+
+def _call_many(queries: List[str], chat_history) -> List[str]:
+    """POST one or more queries to the API over the persistent client.
+
+    A single query behaves like the old synchronous call; multiple queries
+    (e.g. one per ticker) fan out on the bounded worker pool, all sharing
+    CLIENT's connection pool.
+    """
+    # Only the last few turns matter for context, and full report bodies
+    # dominate the payload - trim both before shipping it over the wire
+    compact_history = [
+        {"query": h["query"], "response": h["response"][:500]}
+        for h in list(chat_history)[-5:]
+    ]
+    def one(query: str) -> str:
+        response = CLIENT.post(API_URL, json={
+            "query": query,
+            "source": "web",
+            "chat_history": compact_history
+        })
+        response.raise_for_status()
+        return response.json().get("result", "No response received")
+    if len(queries) == 1:
+        return [one(queries[0])]
+    return list(_CALL_POOL.map(one, queries))
 
 def call_stella_api(query: str, chat_history: List[Dict]) -> Optional[str]:
     """Call the Stella API and return the response"""
     try:
-        payload = {
-            "query": query,
-            "source": "web",
-            "chat_history": chat_history
-        }
-
         with st.spinner("Stella is analyzing..."):
-            response = requests.post(API_URL, json=payload, timeout=API_TIMEOUT)
-            response.raise_for_status()
-
-        data = response.json()
-        return data.get("result", "No response received")
+            return _call_many([query], chat_history)[0]
 
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         st.error("Cannot connect to Stella API. Please ensure the FastAPI server is running on http://127.0.0.1:8001")
         return None
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         st.error("Request timed out. Try a simpler query.")
         return None
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         st.error(f"HTTP Error: {e}")
         return None
     except Exception as e:
         st.error(f"Unexpected error: {e}")
         return None
 
-def process_response_with_llm(raw_response: str, user_query: str) -> str:
-    """Process the raw Stella response with LLM to make it more user-friendly"""
+def process_response_with_llm(raw_response: str, user_query: str, placeholder=None) -> str:
+    """Process the raw Stella response with LLM to make it more user-friendly.
+
+    When a placeholder is given, tokens are streamed into it as they arrive so
+    the user watches the answer build instead of staring at a spinner.
+    """
+    frontend_llm = get_frontend_llm()
     if not frontend_llm or not st.session_state.use_llm_processing:
         return raw_response
 
+    cache_key = LLMCache.make_key(user_query, raw_response)
+    cached = _llm_cache.get(cache_key, raw_response)
+    if cached is not None:
+        st.session_state.cache_hits += 1
+        if placeholder is not None:
+            placeholder.markdown(cached)
+        return cached
+    st.session_state.cache_misses += 1
+
     try:
         from langchain.prompts import PromptTemplate
 
@@ -212,18 +361,32 @@ def process_response_with_llm(raw_response: str, user_query: str) -> str:
             Respond directly to the user as if you're the financial assistant, diving right into the response without any setup."""
         )
 
+        if placeholder is not None:
+            full_response = ""
+            for chunk in frontend_llm.stream(prompt.format(query=user_query, response=raw_response)):
+                full_response += chunk.content
+                placeholder.markdown(full_response)
+            _llm_cache.set(cache_key, raw_response, full_response)
+            return full_response
+
         processed_response = frontend_llm.invoke(
             prompt.format(query=user_query, response=raw_response)
         ).content
 
+        _llm_cache.set(cache_key, raw_response, processed_response)
         return processed_response
 
     except Exception as e:
         st.warning(f"Could not process response with LLM: {e}. Showing raw response.")
         return raw_response
 
+@st.fragment
 def display_chat_history():
-    """Display the chat history using native st.chat_message for better UX"""
+    """Display the chat history using native st.chat_message for better UX.
+
+    Rendering as a fragment lets Streamlit rerun just this block instead of
+    replaying the N-message loop on every unrelated widget interaction.
+    """
     if not st.session_state.messages:
         st.info("💬 Start chatting about stocks, companies, or financial news below!")
         return
@@ -258,26 +421,22 @@ def main():
         st.markdown("---")
 
         st.markdown("### 💡 Quick Examples")
-        st.markdown("""
-        <div class="task-examples">
-        <strong>Stock Analysis:</strong><br>
-        • "Generate a stock report for Tesla"<br>
-        • "Overview of Microsoft"<br>
-        • "Latest news on Apple"<br>
-        • "Today's update on Tesla, Apple"<br><br>
-        <strong>News & Follow-ups:</strong><br>
-        • "Latest AI news"<br>
-        • "More on Nvidia's AI chips"<br>
-        • "Explain Tesla's new model"
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_EXAMPLES_HTML, unsafe_allow_html=True)
 
         st.markdown("---")
         st.markdown("### 🔧 Status")
-        try:
-            response = requests.get("http://127.0.0.1:8001/docs", timeout=5)
+        # Probe the API at most every 30s instead of on every rerun
+        status = st.session_state.get("api_status")
+        if not status or time.time() - status[1] > 30:
+            try:
+                SESSION.get("http://127.0.0.1:8001/docs", timeout=5)
+                status = (True, time.time())
+            except Exception:
+                status = (False, time.time())
+            st.session_state.api_status = status
+        if status[0]:
             st.success("API Connected")
-        except:
+        else:
             st.error("API Not Reachable")
             st.info("Run: `uvicorn app:app --host 127.0.0.1 --port 8001`")
 
@@ -287,16 +446,17 @@ def main():
             value=st.session_state.use_llm_processing, 
             key="llm_processing_toggle"
         )
-        if frontend_llm and st.session_state.use_llm_processing:
+        st.caption(f"Polish cache: {st.session_state.cache_hits} hits / {st.session_state.cache_misses} misses")
+        if get_frontend_llm() and st.session_state.use_llm_processing:
             st.success("LLM Active")
-        elif frontend_llm:
+        elif get_frontend_llm():
             st.info("LLM Ready – Toggle above to enable")
         else:
             st.warning("Configure LLM")
 
         if st.button("🗑️ Clear Chat", use_container_width=True):
             st.session_state.messages = []
-            st.session_state.chat_history = []
+            st.session_state.chat_history.clear()
             st.rerun()
 
     # Main Area: Cleaner header
@@ -320,10 +480,11 @@ def main():
         with st.chat_message("assistant"):
             response = call_stella_api(prompt, st.session_state.chat_history)
             if response:
-                processed_response = process_response_with_llm(response, prompt)
                 assistant_timestamp = time.strftime("%H:%M:%S")
                 st.markdown(f'<div class="message-timestamp">{assistant_timestamp}</div><div class="assistant-message">', unsafe_allow_html=True)
-                st.markdown(processed_response)
+                placeholder = st.empty()
+                processed_response = process_response_with_llm(response, prompt, placeholder)
+                placeholder.markdown(processed_response)
                 st.markdown('</div>', unsafe_allow_html=True)
                 
                 st.session_state.messages.append({"role": "assistant", "content": processed_response, "timestamp": assistant_timestamp})
@@ -332,8 +493,6 @@ def main():
                     "response": response,
                     "timestamp": time.time()
                 })
-                if len(st.session_state.chat_history) > 10:
-                    st.session_state.chat_history = st.session_state.chat_history[-10:]
             else:
                 st.error("Failed to get response. Check the sidebar status.")
 
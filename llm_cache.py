@@ -0,0 +1,29 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+CACHE_EXPIRATION_SECONDS = 86400  # 24 hours, matching the tool data/news caches
+
+
+def cache_key(model: str, prompt) -> str:
+    """Build a stable key for a rendered prompt (string or message list)."""
+    payload = json.dumps({"model": model, "prompt": prompt}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cached_completion(key: str) -> Optional[str]:
+    file = f"data/llm/{key}.json"
+    if os.path.exists(file):
+        mtime = os.path.getmtime(file)
+        if time.time() - mtime < CACHE_EXPIRATION_SECONDS:
+            with open(file, 'r') as f:
+                return json.load(f)["content"]
+    return None
+
+
+def set_cached_completion(key: str, content: str):
+    os.makedirs("data/llm", exist_ok=True)
+    with open(f"data/llm/{key}.json", 'w') as f:
+        json.dump({"content": content}, f)
@@ -2,16 +2,30 @@ import os
 import json
 import re
 import argparse
+import asyncio
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+import io
+import hashlib
 from dotenv import load_dotenv
-import yfinance as yf
 import numpy as np
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from tools import get_news, get_stock_highlights, get_recent_news
+from cache import set_cached_description
 
 load_dotenv()
-llm = ChatOpenAI(model="gpt-5-nano", api_key=os.getenv("OPENAI_API_KEY"))
+
+# ChatOpenAI (and its openai/httpx stack) is only needed for reports/overviews;
+# importing it lazily keeps --history and --warmup runs from paying the cost
+_llm = None
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        from langchain_openai import ChatOpenAI
+        _llm = ChatOpenAI(model="gpt-5-nano", api_key=os.getenv("OPENAI_API_KEY"), max_retries=3)
+    return _llm
 
 # Define frequent companies and tickers
 companies = {
@@ -45,15 +59,55 @@ overview_prompt = PromptTemplate.from_template(
 
 date = datetime.now().strftime("%Y-%m-%d")
 
+# Compiled once; stripping tags per news item recompiled this on every call
+TAG_RE = re.compile(r'<[^>]*>')
+
+# fetch_metrics_and_history results, memoized in-process and persisted to disk
+# so that reports, overviews and history only hit yfinance once per ticker per day
+FETCH_CACHE_SECONDS = 86400
+_fetch_memo = {}
+
 def fetch_metrics_and_history(ticker):
     """
     Fetch metrics and history for a ticker, similar to get_stock_data in tools.py.
-    Returns metrics dict and history DataFrame.
+    Returns metrics dict and history DataFrame. Results are cached in-process and
+    in data/_cache/{ticker}.pkl for FETCH_CACHE_SECONDS.
     """
+    if ticker in _fetch_memo:
+        return _fetch_memo[ticker]
+    cache_file = f"data/_cache/{ticker}.pkl"
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            if time.time() - cached["timestamp"] < FETCH_CACHE_SECONDS:
+                _fetch_memo[ticker] = (cached["metrics"], cached["history"])
+                return _fetch_memo[ticker]
+        except (pickle.UnpicklingError, KeyError, EOFError):
+            pass  # Corrupt cache entry, refetch below
+    import yfinance as yf
     stock = yf.Ticker(ticker)
     info = stock.info
     history = stock.history(period="5y")
-    history["Daily Return"] = history["Close"].pct_change()
+
+    # Metrics come straight from a float64 close array; the DataFrame is only
+    # kept for the CSV export path
+    closes = history["Close"].to_numpy(dtype=np.float64)
+    rets = np.diff(closes) / closes[:-1] if closes.size > 1 else np.array([])
+    n = rets.size
+    ann_vol = rets.std(ddof=1) * np.sqrt(252) if n > 1 else None
+    ann_var = rets.var(ddof=1) * 252 if n > 1 else None
+    if n > 3:
+        # Adjusted Fisher-Pearson excess kurtosis, matching Series.kurtosis()
+        mean = rets.mean()
+        s2 = rets.var(ddof=1)
+        m4 = ((rets - mean) ** 4).sum()
+        kurtosis = (n * (n + 1) / ((n - 1) * (n - 2) * (n - 3))) * m4 / s2 ** 2 \
+            - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+    else:
+        kurtosis = None
+    var_95 = np.quantile(rets, 0.05) if n else None
+    cvar_95 = rets[rets <= var_95].mean() if n else None
 
     metrics = {
         "current_price": info.get("currentPrice"),
@@ -70,87 +124,235 @@ def fetch_metrics_and_history(ticker):
         "book_value_per_share": info.get("bookValue"),
         "debt_to_capital": info.get("debtToEquity"),
         "return_on_equity": info.get("returnOnEquity"),
-        "1y_return": (history["Close"].iloc[-1] / history["Close"].iloc[-252] - 1) if len(history) >= 252 else None,
-        "5y_return": (history["Close"].iloc[-1] / history["Close"].iloc[0] - 1) if len(history) > 0 else None,
-        "50d_ma": round(float(history["Close"].rolling(50).mean().iloc[-1]), 2) if len(history) >= 50 else None,
-        "200d_ma": round(float(history["Close"].rolling(200).mean().iloc[-1]), 2) if len(history) >= 200 else None,
+        "1y_return": (closes[-1] / closes[-252] - 1) if closes.size >= 252 else None,
+        "5y_return": (closes[-1] / closes[0] - 1) if closes.size > 0 else None,
+        "50d_ma": round(float(closes[-50:].mean()), 2) if closes.size >= 50 else None,
+        "200d_ma": round(float(closes[-200:].mean()), 2) if closes.size >= 200 else None,
         "volatility_metrics": {
-            "annualized_vol": history["Daily Return"].std() * np.sqrt(252),
-            "annualized_var": history["Daily Return"].var() * 252,
-            "kurtosis": history["Daily Return"].kurtosis(),
-            "95_var": history["Daily Return"].quantile(0.05),
-            "95_cvar": history["Daily Return"][history["Daily Return"] <= history["Daily Return"].quantile(0.05)].mean(),
+            "annualized_vol": ann_vol,
+            "annualized_var": ann_var,
+            "kurtosis": kurtosis,
+            "95_var": var_95,
+            "95_cvar": cvar_95,
         },
         "business_description": info.get("longBusinessSummary"),
     }
+    os.makedirs("data/_cache", exist_ok=True)
+    with open(cache_file, 'wb') as f:
+        pickle.dump({"timestamp": time.time(), "metrics": metrics, "history": history}, f)
+    _fetch_memo[ticker] = (metrics, history)
     return metrics, history
 
-def generate_reports(selected_companies=None):
-    """Generate and save reports for the selected companies."""
+async def _fetch_inputs(company, ticker):
+    """Fetch metrics and news for a ticker concurrently and save the metrics JSON."""
+    # tools pulls in yfinance/httpx/numpy at import time; deferring keeps
+    # --history runs from paying that cost
+    from tools import get_news
+    (metrics, _), news = await asyncio.gather(
+        asyncio.to_thread(fetch_metrics_and_history, ticker),
+        asyncio.to_thread(get_news, f"latest news on {company}", 5),
+    )
+    # Save metrics JSON (overwrites)
+    with open(f"data/{ticker}_metrics.json", 'w') as f:
+        json.dump(metrics, f, indent=4)
+    # Keep the description bucket in step with the metrics file so the agent's
+    # cache-hit path finds it there too
+    if metrics.get("business_description"):
+        set_cached_description(ticker, metrics["business_description"])
+    return metrics, "\n".join(TAG_RE.sub('', item) for item in news)
+
+def _input_hash(metrics, news_str):
+    """Hash the LLM inputs so unchanged data can skip the call entirely."""
+    payload = json.dumps(metrics, sort_keys=True, default=str).encode() + news_str.encode()
+    return hashlib.sha256(payload).hexdigest()
+
+def _unchanged(md_path, input_hash):
+    """True when the output file exists and its .hash sidecar matches the inputs."""
+    hash_path = os.path.splitext(md_path)[0] + ".hash"
+    if not (os.path.exists(md_path) and os.path.exists(hash_path)):
+        return False
+    with open(hash_path) as f:
+        return f.read().strip() == input_hash
+
+def _write_output(md_path, content, input_hash):
+    with open(md_path, 'w', encoding="utf-8") as f:
+        f.write(content)
+    with open(os.path.splitext(md_path)[0] + ".hash", 'w') as f:
+        f.write(input_hash)
+
+async def _generate_report_one(company, ticker):
+    print(f"Generating report for {company} ({ticker})...")
+    metrics, news_str = await _fetch_inputs(company, ticker)
+    md_path = f"reports/{ticker}_{date}.md"
+    input_hash = _input_hash(metrics, news_str)
+    if _unchanged(md_path, input_hash):
+        print(f"Report inputs unchanged for {company} ({ticker}); skipping LLM call.")
+        return
+    # Generate and save report; compact JSON keeps the prompt deterministic and
+    # shorter than the dict repr
+    metrics_json = json.dumps(metrics, default=str, separators=(",", ":"))
+    report = (await get_llm().ainvoke(report_prompt.format(data=metrics_json, news=news_str))).content
+    _write_output(md_path, report, input_hash)
+    print(f"Report completed for {company} ({ticker}).")
+
+async def generate_reports(selected_companies=None):
+    """Generate and save reports for the selected companies, fanned out concurrently."""
     if selected_companies is None:
         selected_companies = companies
-    for company, ticker in selected_companies.items():
-        print(f"Generating report for {company} ({ticker})...")
-        metrics, _ = fetch_metrics_and_history(ticker)
-        # Save metrics JSON (overwrites)
-        os.makedirs("data", exist_ok=True)
-        with open(f"data/{ticker}_metrics.json", 'w') as f:
-            json.dump(metrics, f, indent=4)
-        # Fetch and clean news
-        news = get_news(f"latest news on {company}", num_results=5)
-        clean_news = [re.sub(r'<.*?>', '', item) for item in news]
-        news_str = "\n".join(clean_news)
-        # Generate and save report
-        report = llm.invoke(report_prompt.format(data=metrics, news=news_str)).content
-        os.makedirs("reports", exist_ok=True)
-        with open(f"reports/{ticker}_{date}.md", 'w', encoding="utf-8") as f:
-            f.write(report)
-        print(f"Report completed for {company} ({ticker}).")
+    os.makedirs("data", exist_ok=True)
+    os.makedirs("reports", exist_ok=True)
+    tasks = [asyncio.create_task(_generate_report_one(c, t)) for c, t in selected_companies.items()]
+    # Drain in completion order so progress shows as each report lands on disk
+    for done, fut in enumerate(asyncio.as_completed(tasks), 1):
+        await fut
+        print(f"({done}/{len(tasks)} reports done)")
+
+async def _generate_overview_one(company, ticker):
+    print(f"Generating overview for {company} ({ticker})...")
+    metrics, news_str = await _fetch_inputs(company, ticker)
+    md_path = f"overviews/{ticker}_{date}.md"
+    input_hash = _input_hash(metrics, news_str)
+    if _unchanged(md_path, input_hash):
+        print(f"Overview inputs unchanged for {company} ({ticker}); skipping LLM call.")
+        return
+    # Generate and save overview
+    metrics_json = json.dumps(metrics, default=str, separators=(",", ":"))
+    overview = (await get_llm().ainvoke(overview_prompt.format(company=company, price=metrics["current_price"], data=metrics_json, news=news_str))).content
+    _write_output(md_path, overview, input_hash)
+    print(f"Overview completed for {company} ({ticker}).")
 
-def generate_overviews(selected_companies=None):
-    """Generate and save overviews for the selected companies."""
+async def generate_overviews(selected_companies=None):
+    """Generate and save overviews for the selected companies, fanned out concurrently."""
     if selected_companies is None:
         selected_companies = companies
+    os.makedirs("data", exist_ok=True)
+    os.makedirs("overviews", exist_ok=True)
+    tasks = [asyncio.create_task(_generate_overview_one(c, t)) for c, t in selected_companies.items()]
+    for done, fut in enumerate(asyncio.as_completed(tasks), 1):
+        await fut
+        print(f"({done}/{len(tasks)} overviews done)")
+
+async def _gather_inputs(selected_companies):
+    """Fetch metrics and news for all companies concurrently, keyed by ticker."""
+    pairs = list(selected_companies.items())
+    results = await asyncio.gather(*(_fetch_inputs(c, t) for c, t in pairs))
+    return {ticker: res for (_, ticker), res in zip(pairs, results)}
+
+def generate_with_batch_api(selected_companies=None, reports=True, overviews=True):
+    """
+    Generate reports and/or overviews through the OpenAI Batch API instead of
+    live calls. Batch requests cost half as much and the whole set completes
+    within the 24h window, which suits a nightly pregeneration run.
+    """
+    if selected_companies is None:
+        selected_companies = companies
+    os.makedirs("data", exist_ok=True)
+    inputs = asyncio.run(_gather_inputs(selected_companies))
+
+    lines = []
+    input_hashes = {}
     for company, ticker in selected_companies.items():
-        print(f"Generating overview for {company} ({ticker})...")
-        metrics, _ = fetch_metrics_and_history(ticker)
-        # Save metrics JSON (overwrites)
-        os.makedirs("data", exist_ok=True)
-        with open(f"data/{ticker}_metrics.json", 'w') as f:
-            json.dump(metrics, f, indent=4)
-        # Fetch and clean news
-        news = get_news(f"latest news on {company}", num_results=5)
-        clean_news = [re.sub(r'<.*?>', '', item) for item in news]
-        news_str = "\n".join(clean_news)
-        # Generate and save overview
-        overview = llm.invoke(overview_prompt.format(company=company, price=metrics["current_price"], data=metrics, news=news_str)).content
+        metrics, news_str = inputs[ticker]
+        metrics_json = json.dumps(metrics, default=str, separators=(",", ":"))
+        input_hashes[ticker] = _input_hash(metrics, news_str)
+        want_report = reports and not _unchanged(f"reports/{ticker}_{date}.md", input_hashes[ticker])
+        want_overview = overviews and not _unchanged(f"overviews/{ticker}_{date}.md", input_hashes[ticker])
+        if (reports and not want_report) or (overviews and not want_overview):
+            print(f"Some outputs for {company} ({ticker}) are already current; skipping those requests.")
+        if want_report:
+            lines.append({
+                "custom_id": f"{ticker}_report",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": "gpt-5-nano",
+                    "messages": [{"role": "user", "content": report_prompt.format(data=metrics_json, news=news_str)}],
+                },
+            })
+        if want_overview:
+            lines.append({
+                "custom_id": f"{ticker}_overview",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": "gpt-5-nano",
+                    "messages": [{"role": "user", "content": overview_prompt.format(company=company, price=metrics["current_price"], data=metrics_json, news=news_str)}],
+                },
+            })
+
+    if not lines:
+        print("All outputs are current; nothing to submit.")
+        return
+
+    from openai import OpenAI
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    payload = io.BytesIO("\n".join(json.dumps(line) for line in lines).encode("utf-8"))
+    batch_file = client.files.create(file=("pregenerate_batch.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"Submitted batch {batch.id} with {len(lines)} requests. Polling for completion...")
+
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(30)
+        batch = client.batches.retrieve(batch.id)
+        print(f"Batch {batch.id} status: {batch.status}")
+    if batch.status != "completed":
+        print(f"Batch {batch.id} ended with status {batch.status}; no files written.")
+        return
+
+    if reports:
+        os.makedirs("reports", exist_ok=True)
+    if overviews:
         os.makedirs("overviews", exist_ok=True)
-        with open(f"overviews/{ticker}_{date}.md", 'w', encoding="utf-8") as f:
-            f.write(overview)
-        print(f"Overview completed for {company} ({ticker}).")
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        result = json.loads(line)
+        ticker, kind = result["custom_id"].rsplit("_", 1)
+        response = result.get("response")
+        if not response or response.get("status_code") != 200:
+            print(f"Batch request {result['custom_id']} failed; skipping.")
+            continue
+        content = response["body"]["choices"][0]["message"]["content"]
+        target_dir = "reports" if kind == "report" else "overviews"
+        _write_output(f"{target_dir}/{ticker}_{date}.md", content, input_hashes[ticker])
+        print(f"{kind.capitalize()} completed for {ticker} (batch).")
 
 def download_stock_history(selected_companies=None):
     """Download and save stock history CSV for the selected companies."""
     if selected_companies is None:
         selected_companies = companies
+    os.makedirs("data", exist_ok=True)
     for company, ticker in selected_companies.items():
         print(f"Downloading history for {company} ({ticker})...")
         _, history = fetch_metrics_and_history(ticker)
-        # Save history CSV (overwrites)
-        os.makedirs("data", exist_ok=True)
-        history.to_csv(f"data/{ticker}_history.csv")
+        # Save history CSV (overwrites); Daily Return is derived here on a copy
+        # so the cached DataFrame stays untouched
+        history.assign(**{"Daily Return": history["Close"].pct_change()}).to_csv(f"data/{ticker}_history.csv")
         print(f"History download completed for {company} ({ticker}).")
 
+def _warm_one(company, ticker):
+    from tools import get_stock_highlights, get_recent_news
+    # This will fetch and cache if not present
+    get_stock_highlights(ticker)
+    get_recent_news(ticker, company)
+    return company, ticker
+
 def warmup_cache(selected_companies=None):
     """Pre-fetch and cache highlights and news for the selected companies (top tickers)."""
     if selected_companies is None:
         selected_companies = companies
-    for company, ticker in selected_companies.items():
-        print(f"Warming up cache for {company} ({ticker})...")
-        # This will fetch and cache if not present
-        get_stock_highlights(ticker)
-        get_recent_news(ticker, company)
-        print(f"Cache warmup completed for {company} ({ticker}).")
+    from tools import prefetch_news
+    # One batched NEWS_SENTIMENT call seeds the news cache for every ticker
+    # before the per-ticker warmers run, so they mostly hit cache
+    prefetch_news(list(selected_companies.values()))
+    # Warmup is pure I/O per ticker, so run the tickers in parallel
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(_warm_one, c, t) for c, t in selected_companies.items()]
+        for future in as_completed(futures):
+            company, ticker = future.result()
+            print(f"Cache warmup completed for {company} ({ticker}).")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Pregenerate data for stock companies.")
@@ -159,6 +361,7 @@ if __name__ == "__main__":
     parser.add_argument("--history", action="store_true", help="Download stock history")
     parser.add_argument("--warmup", action="store_true", help="Warm up cache for highlights and news")
     parser.add_argument("--all", action="store_true", help="Run all tasks")
+    parser.add_argument("--batch", action="store_true", help="Use the OpenAI Batch API for reports/overviews (cheaper, up to 24h)")
     parser.add_argument("--companies", nargs="+", help="Specify companies to process (e.g., Tesla Apple), default all")
 
     args = parser.parse_args()
@@ -172,10 +375,17 @@ if __name__ == "__main__":
     else:
         selected_companies = companies
 
-    if args.all or args.reports:
-        generate_reports(selected_companies)
-    if args.all or args.overviews:
-        generate_overviews(selected_companies)
+    if args.batch and (args.all or args.reports or args.overviews):
+        generate_with_batch_api(
+            selected_companies,
+            reports=args.all or args.reports,
+            overviews=args.all or args.overviews,
+        )
+    else:
+        if args.all or args.reports:
+            asyncio.run(generate_reports(selected_companies))
+        if args.all or args.overviews:
+            asyncio.run(generate_overviews(selected_companies))
     if args.all or args.history:
         download_stock_history(selected_companies)
     if args.all or args.warmup:
@@ -1,11 +1,25 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import yfinance as yf
 import numpy as np
+import httpx
+import orjson
 import requests
-from cache import get_cached_data, set_cached_data, get_cached_news, set_cached_news, get_cached_highlights, set_cached_highlights
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cache import (
+    get_cached_data, set_cached_data,
+    get_cached_news, set_cached_news, get_cached_news_stale,
+    get_cached_highlights, set_cached_highlights, get_cached_highlights_stale,
+    get_cached_description, set_cached_description,
+)
 from dotenv import load_dotenv
 import os
 import time
+import threading
+from datetime import datetime, timedelta
+from itertools import islice
 from typing import Optional
 
 load_dotenv()
@@ -16,76 +30,290 @@ DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
 logging.basicConfig(level=logging.DEBUG if DEBUG_MODE else logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Endpoint constants built once; request paths only format the ticker in
+_BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+_BRAVE_HEADERS = {"Accept": "application/json", "X-Subscription-Token": BRAVE_API_KEY}
+_AV_QUOTE_TMPL = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={{ticker}}&apikey={ALPHA_VANTAGE_API_KEY}"
+_AV_DAILY_TMPL = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={{ticker}}&outputsize=compact&apikey={ALPHA_VANTAGE_API_KEY}"
+_AV_NEWS_TMPL = f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers={{ticker}}&limit=5&sort=LATEST&apikey={ALPHA_VANTAGE_API_KEY}"
+
+try:
+    import requests_cache
+except ImportError:  # optional - plain Session below works the same, uncached
+    requests_cache = None
+
+# One pooled session for all synchronous HTTP in this module - keep-alive
+# connections plus automatic retries on transient upstream errors. With
+# requests_cache installed, identical GETs within the expiry window are served
+# from sqlite without touching the network at all; the get_cached_* layer in
+# cache.py stays on top as the parsed in-memory tier.
+if requests_cache is not None:
+    _http = requests_cache.CachedSession(
+        'data/tools_http_cache',
+        backend='sqlite',
+        expire_after=3600,
+        urls_expire_after={
+            'api.search.brave.com/*': 900,  # freshness=pd queries go stale fast
+            'www.alphavantage.co/*': 1800,
+        },
+    )
+else:
+    _http = requests.Session()
+_http.headers.update({"Accept-Encoding": "gzip, deflate, br"})
+_http.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
 def time_it(func):
+    # perf_counter_ns avoids wall-clock jumps; %-style args defer formatting
+    # until the log record is actually emitted
     def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        logger.info(f"{func.__name__} took {time.time() - start:.2f} seconds")
+        logger.info("%s took %.2f seconds", func.__name__, (time.perf_counter_ns() - start) / 1e9)
         return result
     return wrapper
 
-@time_it
+# Stale-while-revalidate support: stale cache entries are served immediately
+# and refreshed here in the background; the in-flight set keeps a burst of
+# requests for one ticker from stacking duplicate refreshes
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+_refreshing: set = set()
+_refresh_lock = threading.Lock()
+
+def _refresh_in_background(key, fn, *args):
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.debug(f"Background refresh failed for {key}: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    _REFRESH_EXECUTOR.submit(run)
+
+# Ticker objects memoized per symbol. Each yf.Ticker carries its own HTTP
+# session and caches metadata lookups, so reusing one avoids a fresh handshake
+# and re-fetch per call. yfinance manages its own (curl_cffi) session now, so
+# no external requests.Session is injected here.
+_ticker_cache: dict = {}
+
+def _yf_ticker(symbol: str) -> yf.Ticker:
+    ticker = _ticker_cache.get(symbol)
+    if ticker is None:
+        ticker = _ticker_cache.setdefault(symbol, yf.Ticker(symbol))
+    return ticker
+
+# Output metric name -> yfinance info key, shared by both fetch paths
+_INFO_MAP = (
+    ("current_price", "currentPrice"),
+    ("price_target", "targetMeanPrice"),  # Analyst target
+    ("52_week_high", "fiftyTwoWeekHigh"),
+    ("52_week_low", "fiftyTwoWeekLow"),
+    ("avg_volume", "averageVolume"),
+    ("beta", "beta"),
+    ("dividend_yield", "dividendYield"),
+    ("shares_outstanding", "sharesOutstanding"),
+    ("market_cap", "marketCap"),
+    ("institutional_holdings", "heldPercentInstitutions"),
+    ("insider_holdings", "heldPercentInsiders"),
+    ("book_value_per_share", "bookValue"),
+    ("debt_to_capital", "debtToEquity"),
+    ("return_on_equity", "returnOnEquity"),
+)
+
 def get_stock_data(ticker: str) -> dict:
-    """Fetch and cache stock data using yfinance."""
+    """Fetch and cache stock data using yfinance.
+
+    The cache-hit path stays undecorated so time_it only reports real fetches
+    instead of burying them in microsecond cache reads.
+    """
     cached = get_cached_data(ticker)
     if cached:
         logger.debug(f"Cache hit for ticker: {ticker}")
-        return cached
-    
+        return {**cached, "business_description": get_cached_description(ticker) or cached.get("business_description")}
+    return _fetch_stock_data(ticker)
+
+@time_it
+def _fetch_stock_data(ticker: str) -> dict:
     logger.debug(f"Fetching fresh data for ticker: {ticker}")
     try:
-        stock = yf.Ticker(ticker)
+        stock = _yf_ticker(ticker)
         info = stock.info
         history = stock.history(period="5y")
-        history["Daily Return"] = history["Close"].pct_change()
-        
-        metrics = {
-            "current_price": info.get("currentPrice"),
-            "price_target": info.get("targetMeanPrice"),  # Analyst target
-            "52_week_high": info.get("fiftyTwoWeekHigh"),
-            "52_week_low": info.get("fiftyTwoWeekLow"),
-            "avg_volume": info.get("averageVolume"),
-            "beta": info.get("beta"),
-            "dividend_yield": info.get("dividendYield"),
-            "shares_outstanding": info.get("sharesOutstanding"),
-            "market_cap": info.get("marketCap"),
-            "institutional_holdings": info.get("heldPercentInstitutions"),
-            "insider_holdings": info.get("heldPercentInsiders"),
-            "book_value_per_share": info.get("bookValue"),
-            "debt_to_capital": info.get("debtToEquity"),
-            "return_on_equity": info.get("returnOnEquity"),
-            "1y_return": (history["Close"].iloc[-1] / history["Close"].iloc[-252] - 1) if len(history) >= 252 else None,
-            "5y_return": (history["Close"].iloc[-1] / history["Close"].iloc[0] - 1) if len(history) > 0 else None,
-            "50d_ma": history["Close"].rolling(50).mean().iloc[-1],
-            "200d_ma": history["Close"].rolling(200).mean().iloc[-1],
-            "volatility_metrics": {
-                "annualized_vol": history["Daily Return"].std() * np.sqrt(252),
-                "annualized_var": history["Daily Return"].var() * 252,
-                "kurtosis": history["Daily Return"].kurtosis(),
-                "95_var": history["Daily Return"].quantile(0.05),
-                "95_cvar": history["Daily Return"][history["Daily Return"] <= history["Daily Return"].quantile(0.05)].mean(),
-            },
-            "business_description": info.get("longBusinessSummary"),
-        }
-        
+
+        # One float64 array feeds every derived metric; no pandas passes and no
+        # Daily Return column (nothing downstream reads it)
+        close_np = history["Close"].to_numpy(dtype=np.float64)
+        ret = np.diff(close_np) / close_np[:-1] if close_np.size > 1 else np.array([])
+
+        metrics = {out: info.get(src) for out, src in _INFO_MAP}
+        metrics.update({
+            "1y_return": float(close_np[-1] / close_np[-252] - 1) if close_np.size >= 252 else None,
+            "5y_return": float(close_np[-1] / close_np[0] - 1) if close_np.size > 0 else None,
+            "50d_ma": _tail_ma(close_np, 50),
+            "200d_ma": _tail_ma(close_np, 200),
+            "volatility_metrics": _return_stats(ret),
+        })
+
+        # The description is large, static text - it lives in its own bucket
+        # with a longer TTL so the numeric cache stays small
+        description = info.get("longBusinessSummary")
         set_cached_data(ticker, metrics)
+        if description:
+            set_cached_description(ticker, description)
         logger.info(f"Data fetched and cached for {ticker}")
-        return metrics
+        return {**metrics, "business_description": description}
     except Exception as e:
         logger.error(f"Error fetching stock data for {ticker}: {e}")
         return {}
 
+def _tail_ma(arr: np.ndarray, n: int) -> Optional[float]:
+    """Trailing n-period moving average, or None when there isn't enough data."""
+    return float(arr[-n:].mean()) if arr.size >= n else None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy kernel below is used instead
+    njit = None
+
+def _vol_stats_kernel(rets):
+    """Mean and the 2nd/4th central moment sums in one pass over the array."""
+    mean = rets.mean()
+    d = rets - mean
+    d2 = d * d
+    return mean, d2.sum(), (d2 * d2).sum()
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _vol_stats_kernel(rets):  # noqa: F811 - JIT-compiled replacement
+        # Single fused pass: power sums accumulated around the first element
+        # as shift (keeps the sums small enough for the central-moment
+        # conversion to stay stable), then converted to the same
+        # (mean, m2, m4) contract as the NumPy kernel. Accumulators stay
+        # float64 - float32 raw-moment sums visibly shift the kurtosis.
+        n = rets.size
+        c = rets[0]
+        s1 = 0.0
+        s2 = 0.0
+        s3 = 0.0
+        s4 = 0.0
+        for i in range(n):
+            d = rets[i] - c
+            d2 = d * d
+            s1 += d
+            s2 += d2
+            s3 += d2 * d
+            s4 += d2 * d2
+        delta = s1 / n
+        m2 = s2 - n * delta * delta
+        m4 = s4 - 4.0 * delta * s3 + 6.0 * delta * delta * s2 - 3.0 * n * delta ** 4
+        return c + delta, m2, m4
+
+    # Warm the JIT at import so the first request doesn't pay compilation
+    _vol_stats_kernel(np.array([0.01, -0.01, 0.02]))
+
+def _return_stats(rets: np.ndarray) -> dict:
+    """Volatility metrics from a daily-returns array.
+
+    Kurtosis uses the adjusted Fisher-Pearson formula so the numbers match the
+    pandas Series.kurtosis() values the cache has always held.
+    """
+    n = rets.size
+    if n < 2:
+        return {"annualized_vol": None, "annualized_var": None, "kurtosis": None, "95_var": None, "95_cvar": None}
+    _, m2, m4 = _vol_stats_kernel(rets)
+    s2 = m2 / (n - 1)
+    kurtosis = None
+    if n > 3 and s2 > 0:
+        kurtosis = float((n * (n + 1) / ((n - 1) * (n - 2) * (n - 3))) * m4 / s2 ** 2
+                         - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+    # np.partition places the k smallest returns first without a full sort:
+    # the k-th order statistic is the 5% VaR and the left partition is the
+    # CVaR tail, turning O(n log n) plus a boolean-mask pass into O(n)
+    k = max(1, int(0.05 * n))
+    part = np.partition(rets, k)
+    return {
+        "annualized_vol": float(np.sqrt(s2 * 252)),
+        "annualized_var": float(s2 * 252),
+        "kurtosis": kurtosis,
+        "95_var": float(part[k]),
+        "95_cvar": float(part[:k + 1].mean()),
+    }
+
+@time_it
+def get_stock_data_bulk(tickers: list) -> dict:
+    """Fetch stock data for several tickers, sharing one yfinance download.
+
+    Cache hits are returned as-is; the misses go out in a single threaded
+    yf.download for history plus a thread pool for the per-ticker info calls,
+    instead of one full get_stock_data round-trip per ticker.
+    """
+    results = {}
+    to_fetch = []
+    for ticker in tickers:
+        cached = get_cached_data(ticker)
+        if cached:
+            logger.debug(f"Cache hit for ticker: {ticker}")
+            results[ticker] = {**cached, "business_description": get_cached_description(ticker) or cached.get("business_description")}
+        else:
+            to_fetch.append(ticker)
+    if not to_fetch:
+        return results
+
+    logger.debug(f"Bulk fetching fresh data for tickers: {to_fetch}")
+    try:
+        history = yf.download(to_fetch, period="5y", threads=True, group_by='ticker', auto_adjust=False)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            infos = dict(zip(to_fetch, executor.map(lambda t: _yf_ticker(t).info, to_fetch)))
+    except Exception as e:
+        logger.error(f"Error bulk fetching stock data for {to_fetch}: {e}")
+        for ticker in to_fetch:
+            results[ticker] = {}
+        return results
+
+    for ticker in to_fetch:
+        try:
+            info = infos.get(ticker) or {}
+            symbol_history = history[ticker] if len(to_fetch) > 1 else history
+            closes = symbol_history["Close"].dropna().to_numpy(dtype=np.float64)
+            rets = np.diff(closes) / closes[:-1] if closes.size > 1 else np.array([])
+            metrics = {out: info.get(src) for out, src in _INFO_MAP}
+            metrics.update({
+                "1y_return": float(closes[-1] / closes[-252] - 1) if closes.size >= 252 else None,
+                "5y_return": float(closes[-1] / closes[0] - 1) if closes.size > 0 else None,
+                "50d_ma": _tail_ma(closes, 50),
+                "200d_ma": _tail_ma(closes, 200),
+                "volatility_metrics": _return_stats(rets),
+            })
+            description = info.get("longBusinessSummary")
+            set_cached_data(ticker, metrics)
+            if description:
+                set_cached_description(ticker, description)
+            results[ticker] = {**metrics, "business_description": description}
+        except Exception as e:
+            logger.error(f"Error building metrics for {ticker}: {e}")
+            results[ticker] = {}
+    logger.info(f"Bulk data fetched and cached for {to_fetch}")
+    return results
+
 @time_it
 def get_news(query: str, num_results: int = 5) -> list:
     """Fetch news using Brave Search API."""
     logger.debug(f"Calling Brave API with query: {query}, num_results: {num_results}")
     try:
-        url = "https://api.search.brave.com/res/v1/web/search"
-        headers = {"Accept": "application/json", "X-Subscription-Token": BRAVE_API_KEY}
         params = {"q": query, "count": num_results, "freshness": "pd"}  # Past day for latest
-        response = requests.get(url, headers=headers, params=params)
+        response = _http.get(_BRAVE_SEARCH_URL, headers=_BRAVE_HEADERS, params=params)
         response.raise_for_status()  # Raise if not 200
-        results = response.json().get("web", {}).get("results", [])
+        results = orjson.loads(response.content).get("web", {}).get("results", [])
         news_list = [r["title"] + ": " + r["description"] for r in results]
         logger.info(f"Fetched {len(news_list)} news items for query: {query}")
         return news_list
@@ -101,26 +329,42 @@ def get_company_news(company: str) -> list:
 def get_general_news(topic: str) -> list:
     return get_news(f"latest news on {topic}")
 
-@time_it
 def get_stock_highlights(ticker: str) -> dict:
     """Fetch stock highlights (current price, daily change, MAs) with preference for yfinance, fallback to Alpha Vantage."""
-    cached = get_cached_highlights(ticker)
-    if cached:
-        logger.debug(f"Highlights cache hit for ticker: {ticker}")
+    cached, fresh = get_cached_highlights_stale(ticker)
+    if cached is not None:
+        if fresh:
+            logger.debug(f"Highlights cache hit for ticker: {ticker}")
+        else:
+            # Serve the stale entry now and revalidate off the request path
+            logger.debug(f"Serving stale highlights for {ticker}; refreshing in background")
+            _refresh_in_background(("highlights", ticker), _fetch_stock_highlights, ticker)
         return cached
+    return _fetch_stock_highlights(ticker)
 
+@time_it
+def _fetch_stock_highlights(ticker: str) -> dict:
     logger.debug(f"Fetching fresh highlights for ticker: {ticker}")
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        current = info.get('currentPrice')
-        prev_close = info.get('previousClose')
+        stock = _yf_ticker(ticker)
+        # fast_info hits a lightweight quote endpoint and covers everything
+        # highlights need, avoiding the much heavier full info fetch
+        fast = stock.fast_info
+        current = fast['last_price']
+        prev_close = fast['previous_close']
         daily_change = ((current - prev_close) / prev_close * 100) if prev_close and current else None
-        history = stock.history(period="1y")
-        if len(history) < 200:
-            raise ValueError("Not enough history data")
-        ma50 = round(float(history['Close'].rolling(50).mean().iloc[-1]), 2) if len(history) >= 50 else None
-        ma200 = round(float(history['Close'].rolling(200).mean().iloc[-1]), 2) if len(history) >= 200 else None
+        try:
+            ma50 = round(float(fast['fifty_day_average']), 2)
+            ma200 = round(float(fast['two_hundred_day_average']), 2)
+        except (KeyError, TypeError):
+            # Only fetch history when fast_info lacks the averages, and then
+            # only a ~210-trading-day window rather than a full year
+            history = stock.history(start=datetime.now() - timedelta(days=320))
+            closes = history['Close'].to_numpy(dtype=np.float64)
+            if closes.size < 200:
+                raise ValueError("Not enough history data")
+            ma50 = round(_tail_ma(closes, 50), 2)
+            ma200 = round(_tail_ma(closes, 200), 2)
         metrics = {
             'current_price': current,
             'daily_change': daily_change,
@@ -132,30 +376,9 @@ def get_stock_highlights(ticker: str) -> dict:
         return metrics
     except Exception as e:
         logger.debug(f"yfinance failed for highlights {ticker}: {e}, falling back to Alpha Vantage")
-    
+
     try:
-        # Global Quote for price and change
-        url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={ticker}&apikey={ALPHA_VANTAGE_API_KEY}"
-        resp = requests.get(url).json()
-        quote = resp.get('Global Quote', {})
-        current = float(quote.get('05. price', 0)) if quote else None
-        prev_close = float(quote.get('08. previous close', 0)) if quote else None
-        daily_change = float(quote.get('10. change percent', '0%')[:-1]) if quote else None
-
-        # Time Series for MAs
-        url_ts = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={ticker}&outputsize=compact&apikey={ALPHA_VANTAGE_API_KEY}"
-        resp_ts = requests.get(url_ts).json()
-        ts = resp_ts.get('Time Series (Daily)', {})
-        dates = sorted(ts.keys(), reverse=True)[:200]
-        closes = [float(ts[d]['4. close']) for d in dates if d in ts]
-        ma50 = round(sum(closes[:50]) / 50, 2) if len(closes) >= 50 else None
-        ma200 = round(sum(closes[:200]) / 200, 2) if len(closes) >= 200 else None
-        metrics = {
-            'current_price': current,
-            'daily_change': daily_change,
-            '50d_ma': ma50,
-            '200d_ma': ma200
-        }
+        metrics = asyncio.run(_fetch_av_highlights(ticker))
         set_cached_highlights(ticker, metrics)
         logger.info(f"Highlights fetched from Alpha Vantage and cached for {ticker}")
         return metrics
@@ -163,42 +386,149 @@ def get_stock_highlights(ticker: str) -> dict:
         logger.error(f"Error fetching highlights for {ticker}: {e}")
         return {}
 
+async def _fetch_av_highlights(ticker: str) -> dict:
+    """Fetch the two Alpha Vantage highlight endpoints concurrently.
+
+    The quote and the daily time series are independent requests, so issuing
+    them with asyncio.gather halves the fallback's wall-clock time.
+    """
+    async with httpx.AsyncClient(timeout=30) as client:
+        quote_resp, ts_resp = await asyncio.gather(
+            client.get(_AV_QUOTE_TMPL.format(ticker=ticker)),
+            client.get(_AV_DAILY_TMPL.format(ticker=ticker)),
+        )
+    quote = orjson.loads(quote_resp.content).get('Global Quote', {})
+    current = float(quote.get('05. price', 0)) if quote else None
+    prev_close = float(quote.get('08. previous close', 0)) if quote else None
+    daily_change = float(quote.get('10. change percent', '0%')[:-1]) if quote else None
+
+    # The compact time series arrives newest-first and holds only ~100 rows,
+    # so there is nothing to sort and a 200-day MA can never be computed here
+    ts = orjson.loads(ts_resp.content).get('Time Series (Daily)', {})
+    closes = np.fromiter((float(v['4. close']) for v in islice(ts.values(), 50)), dtype=np.float64)
+    ma50 = round(float(closes.mean()), 2) if closes.size >= 50 else None
+    return {
+        'current_price': current,
+        'daily_change': daily_change,
+        '50d_ma': ma50,
+        '200d_ma': None
+    }
+
 @time_it
-def get_recent_news(ticker: str, company: Optional[str] = None) -> list:
-    """Fetch recent news with preference for Alpha Vantage, fallback to yfinance then Brave."""
-    cached = get_cached_news(ticker)
-    if cached:
-        logger.debug(f"News cache hit for ticker: {ticker}")
-        return cached
+def prefetch_news(tickers: list) -> dict:
+    """Warm the news cache for several tickers with concurrent Alpha Vantage calls.
 
-    logger.debug(f"Fetching fresh news for ticker: {ticker}")
-    try:
-        url = f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers={ticker}&limit=5&sort=LATEST&apikey={ALPHA_VANTAGE_API_KEY}"
-        resp = requests.get(url).json()
-        feed = resp.get('feed', [])
+    NEWS_SENTIMENT's tickers= parameter is AND-semantics (only articles that
+    mention every listed symbol), so a comma-separated batch is useless for
+    unrelated tickers - each one gets its own request instead, fanned out on
+    the news pool. Results are cached with set_cached_news.
+    """
+    to_fetch = [t for t in tickers if get_cached_news(t) is None]
+    if not to_fetch:
+        return {}
+
+    def fetch_one(ticker):
+        resp = _http.get(_AV_NEWS_TMPL.format(ticker=ticker))
+        feed = orjson.loads(resp.content).get('feed', [])
+        return [f"{item['title']}: {item['summary']}" for item in feed[:5]]
+
+    grouped = {}
+    futures = {_NEWS_EXECUTOR.submit(fetch_one, t): t for t in to_fetch}
+    for future in as_completed(futures):
+        ticker = futures[future]
+        try:
+            grouped[ticker] = future.result()
+        except Exception as e:
+            logger.error(f"Error prefetching news for {ticker}: {e}")
+            grouped[ticker] = []
+    for t, news_list in grouped.items():
+        if news_list:
+            set_cached_news(t, news_list)
+    logger.info(f"Prefetched news for {[t for t, n in grouped.items() if n]}")
+    return grouped
+
+# Fallback news providers run on this detached pool instead of asyncio's
+# default executor: asyncio.run joins the default executor's threads on
+# shutdown, which would make every race block on its losing provider
+_NEWS_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+_AV_NEWS_TIMEOUT_SECONDS = 3  # AV usually answers well under a second
+
+async def _race_news_providers(ticker: str, company: Optional[str]) -> list:
+    """Try Alpha Vantage first, then race the fallbacks.
+
+    Alpha Vantage is the preferred provider and the fast one, so it gets a
+    short exclusive window - the common case costs no yfinance or Brave
+    calls at all. Only when AV fails or misses its deadline do yfinance and
+    Brave race, with the yfinance result preferred when both succeed.
+    """
+    async def from_av():
+        url = _AV_NEWS_TMPL.format(ticker=ticker)
+        async with httpx.AsyncClient(timeout=30) as client:
+            resp = await client.get(url)
+        feed = orjson.loads(resp.content).get('feed', [])
         if not feed:
             raise ValueError("No news from Alpha Vantage")
-        news_list = [f"{item['title']}: {item['summary']}" for item in feed]
-        set_cached_news(ticker, news_list)
-        logger.info(f"News fetched from Alpha Vantage and cached for {ticker}")
+        return [f"{item['title']}: {item['summary']}" for item in feed]
+
+    def yf_fetch():
+        ynews = _yf_ticker(ticker).news
+        news_list = [f"{n['title']}: {n.get('publisher', '')} - {n.get('link', '')}" for n in ynews[:5]]
+        if not news_list:
+            raise ValueError("No news from yfinance")
+        return news_list
+
+    def brave_fetch():
+        if not company:
+            raise ValueError("No company name for Brave search")
+        news_list = get_news(f"latest news on {company} stock", 5)
+        if not news_list:
+            raise ValueError("No news from Brave")
         return news_list
-    except Exception as e:
-        logger.debug(f"Alpha Vantage news failed for {ticker}: {e}, falling back")
 
     try:
-        stock = yf.Ticker(ticker)
-        ynews = stock.news
-        news_list = [f"{n['title']}: {n.get('publisher', '')} - {n.get('link', '')}" for n in ynews[:5]]
-        if news_list:
-            set_cached_news(ticker, news_list)
-            logger.info(f"News fetched from yfinance and cached for {ticker}")
-            return news_list
+        return await asyncio.wait_for(from_av(), timeout=_AV_NEWS_TIMEOUT_SECONDS)
     except Exception as e:
-        logger.debug(f"yfinance news failed for {ticker}: {e}, falling back to Brave")
+        logger.debug(f"Alpha Vantage news unavailable for {ticker}: {e}")
 
-    if company:
-        news_list = get_news(f"latest news on {company} stock", num_results=5)
+    # Priority order; the lower-priority win is only used once everything
+    # above it has failed
+    loop = asyncio.get_running_loop()
+    tasks = [loop.run_in_executor(_NEWS_EXECUTOR, fn) for fn in (yf_fetch, brave_fetch)]
+    pending = set(tasks)
+    while pending:
+        _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for i, task in enumerate(tasks):
+            if not task.done() or task.cancelled() or task.exception():
+                continue
+            if all(t.done() and (t.cancelled() or t.exception()) for t in tasks[:i]):
+                for leftover in pending:
+                    leftover.cancel()
+                return task.result()
+    return []
+
+def get_recent_news(ticker: str, company: Optional[str] = None) -> list:
+    """Fetch recent news with preference for Alpha Vantage, fallback to yfinance then Brave."""
+    cached, fresh = get_cached_news_stale(ticker)
+    if cached is not None:
+        if fresh:
+            logger.debug(f"News cache hit for ticker: {ticker}")
+        else:
+            logger.debug(f"Serving stale news for {ticker}; refreshing in background")
+            _refresh_in_background(("news", ticker), _fetch_recent_news, ticker, company)
+        return cached
+    return _fetch_recent_news(ticker, company)
+
+@time_it
+def _fetch_recent_news(ticker: str, company: Optional[str] = None) -> list:
+    logger.debug(f"Fetching fresh news for ticker: {ticker}")
+    try:
+        news_list = asyncio.run(_race_news_providers(ticker, company))
+    except Exception as e:
+        logger.error(f"Error fetching news for {ticker}: {e}")
+        return []
+    if news_list:
         set_cached_news(ticker, news_list)
-        logger.info(f"News fetched from Brave and cached for {ticker}")
+        logger.info(f"News fetched and cached for {ticker}")
         return news_list
     return []
\ No newline at end of file